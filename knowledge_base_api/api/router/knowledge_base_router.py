@@ -1,58 +1,123 @@
 import logging
+import os
+from asyncio import to_thread
 from fastapi import APIRouter, HTTPException, status, UploadFile, File, Body
 from pydantic import BaseModel
 from knowledge_base_api.clients.ModelNotFoundError import ModelNotFoundError
-from knowledge_base_api.clients.question_processor import process_question
-from knowledge_base_api.clients.renew_base import main as renew_knowledge_base
+from knowledge_base_api.clients.chunking import zip_knowledge_base
+from knowledge_base_api.clients.kb_manifest import get_kb_version
+from knowledge_base_api.clients.question_processor import embed_question, process_question
+from knowledge_base_api.clients.renew_jobs import get_job_status, submit_renew_job
 import zipfile
 import tempfile
 
 logger = logging.getLogger(__name__)
 knowledge_base_router = APIRouter()
 
+KB_UPLOAD_MAX_BYTES = int(os.getenv("KB_UPLOAD_MAX_BYTES", 1024 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 class QuestionRequest(BaseModel):
     question: str
 
 @knowledge_base_router.post(
     "/knowledge-base/renew",
-    status_code=status.HTTP_200_OK,
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Обновить базу знаний",
-    description="Запускает процесс обновления базы знаний в векторной базе."
+    description="Ставит в очередь задачу обновления базы знаний в векторной базе и возвращает её идентификатор."
 )
-async def update_knowledge_base(zip_file: UploadFile = File(...)):
+async def update_knowledge_base(zip_file: UploadFile = File(...), delta: bool = True):
     """
-    Updates the knowledge base from the uploaded ZIP file.
+    Queues a knowledge base update from the uploaded ZIP file.
+
+    The upload is streamed to a temporary file in fixed-size chunks and
+    validated without extraction; the renew worker process reads the text
+    files straight from the archive and removes it when the job finishes.
 
     Args:
         zip_file (UploadFile): ZIP file containing data to update the knowledge base.
+        delta (bool): If True, only changed chunks are re-indexed;
+            if False, every collection from the archive is rebuilt.
 
     Returns:
-        dict: Message indicating successful knowledge base update.
+        dict: Identifier of the queued renew job.
 
     Raises:
-        HTTPException: If an error occurs during the update, returns a 500 error with details.
+        HTTPException: 413 if the upload exceeds KB_UPLOAD_MAX_BYTES,
+            400 if the archive is invalid or exceeds the ZIP limits,
+            500 with details if another error occurs while accepting the archive.
     """
+    temp_file_path = None
     try:
-        logger.info(f"Renew knowledge base by zip_file: {zip_file}")
+        logger.info(f"Renew knowledge base by zip_file: {zip_file.filename}")
 
-        temp_file_path = f"/tmp/{zip_file.filename}"
-        with open(temp_file_path, "wb") as buffer:
-            buffer.write(await zip_file.read())
+        fd, temp_file_path = tempfile.mkstemp(suffix=".zip")
+        size = 0
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := await zip_file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > KB_UPLOAD_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Архив больше {KB_UPLOAD_MAX_BYTES} байт."
+                    )
+                await to_thread(buffer.write, chunk)
 
-        logger.info(f"Received zip_file: {zip_file}, saved to {temp_file_path}")
+        logger.info(f"Received zip_file: {zip_file.filename} ({size} bytes), saved to {temp_file_path}")
 
-        data_folder = tempfile.mkdtemp()
-        with zipfile.ZipFile(temp_file_path, 'r') as zip_ref:
-            logger.info(f"Extracting zip_file to {data_folder}")
-            zip_ref.extractall(data_folder)
+        try:
+            files = await to_thread(zip_knowledge_base, temp_file_path)
+        except (ValueError, zipfile.BadZipFile) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Некорректный архив: {e}"
+            )
 
-        await renew_knowledge_base(data_folder)
-        return {"message": "База знаний успешно обновлена."}
+        job_id = submit_renew_job(temp_file_path, delta=delta, cleanup_path=temp_file_path)
+        temp_file_path = None
+        return {
+            "message": "Обновление базы знаний поставлено в очередь.",
+            "job_id": job_id,
+            "status": "queued",
+            "files": len(files)
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+    finally:
+        if temp_file_path is not None:
+            os.remove(temp_file_path)
+
+@knowledge_base_router.get(
+    "/knowledge-base/renew/{job_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Статус обновления базы знаний",
+    description="Возвращает фазу, прогресс и время выполнения задачи обновления базы знаний."
+)
+async def get_renew_status(job_id: str):
+    """
+    Returns the status of a renew job.
+
+    Args:
+        job_id (str): Identifier returned by ``POST /knowledge-base/renew``.
+
+    Returns:
+        dict: Job status with phase, per-branch progress, timings and, once finished, the result or error.
+
+    Raises:
+        HTTPException: 404 if the job is unknown.
+    """
+    job_status = await to_thread(get_job_status, job_id)
+    if job_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Задача обновления не найдена."
+        )
+    return job_status
 
 @knowledge_base_router.post(
     "/knowledge-base/prepare-question",
@@ -85,3 +150,29 @@ async def prepare_question(request: QuestionRequest):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+@knowledge_base_router.post(
+    "/knowledge-base/embed-question",
+    status_code=status.HTTP_200_OK,
+    summary="Получить эмбеддинг вопроса",
+    description="Возвращает эмбеддинг вопроса пользователя и текущую версию базы знаний."
+)
+async def embed_question_endpoint(request: QuestionRequest):
+    """
+    Endpoint returning the question embedding together with the knowledge base version,
+    so that clients can key answer caches on both.
+
+    The question is embedded with the e5 "query: " prefix, which makes
+    question-to-question similarities more discriminative.
+    """
+    try:
+        embedding = await embed_question(f"query: {request.question}")
+        kb_version = await to_thread(get_kb_version)
+        return {"embedding": embedding, "kb_version": kb_version}
+    except Exception as e:
+        logger.error(f"Error embedding question: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
@@ -1,12 +1,28 @@
 import os
+import uuid
+import zipfile
+from collections import Counter, namedtuple
+from contextlib import contextmanager
 from functools import lru_cache
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from sentence_transformers import SentenceTransformer
 from qdrant_client.models import PointStruct
+from knowledge_base_api.clients.embedding_cache import cache_key, get_embedding_cache
 
 import logging
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL_NAME = "intfloat/multilingual-e5-large"
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 32))
+CHUNK_ID_NAMESPACE = uuid.UUID("6f1c5b3e-2d8a-4f4e-9a57-0c3e8b7d9a21")
+
+KB_ZIP_MAX_MEMBER_BYTES = int(os.getenv("KB_ZIP_MAX_MEMBER_BYTES", 200 * 1024 * 1024))
+KB_ZIP_MAX_TOTAL_BYTES = int(os.getenv("KB_ZIP_MAX_TOTAL_BYTES", 2 * 1024 * 1024 * 1024))
+KB_ZIP_MAX_RATIO = float(os.getenv("KB_ZIP_MAX_RATIO", 100))
+
+Chunk = namedtuple('Chunk', 'id text parent_id level')
+ZipMember = namedtuple('ZipMember', 'zip_path name')
+
 @lru_cache(maxsize=None)
 def get_model():
     """
@@ -15,27 +31,82 @@ def get_model():
     Returns:
         SentenceTransformer: Initialized SentenceTransformer model.
     """
-    return SentenceTransformer("intfloat/multilingual-e5-large")
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
 
 
-def chunking(input_file, name):
+def encode_texts(texts, batch_size=EMBEDDING_BATCH_SIZE):
     """
-    Splits a text file into large and small chunks,
-    computes their embeddings, and creates point lists for indexing.
+    Encodes texts with the embedding model in batches.
+
+    Embeddings already present in the persistent embedding cache are reused;
+    only the missing texts are encoded and then stored in the cache.
+    Texts are sorted by length before batching so that every batch contains
+    texts of similar size and the tokenizer pads as little as possible.
 
     Args:
-        input_file (str): Path to the text file to be processed.
-        name (str): Document name (used in the payload of points).
+        texts (list[str]): Texts to encode.
+        batch_size (int): Number of texts per forward pass.
 
     Returns:
-        dict: Dictionary with two lists of points:
-            {
-                "Large": list of PointStruct for large chunks,
-                "Small": list of PointStruct for small chunks
-            }
-        Returns None if the file is not found.
+        list[list[float]]: Embeddings in the same order as ``texts``.
+    """
+    cache = get_embedding_cache()
+    embeddings = [None] * len(texts)
+    keys = [cache_key(EMBEDDING_MODEL_NAME, text) for text in texts]
+    if cache is not None:
+        cached = cache.get_many(keys)
+        for idx, key in enumerate(keys):
+            embeddings[idx] = cached.get(key)
+
+    missing = [idx for idx in range(len(texts)) if embeddings[idx] is None]
+    if missing:
+        model = get_model()
+        order = sorted(missing, key=lambda idx: len(texts[idx]))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            vectors = model.encode([texts[idx] for idx in batch], batch_size=len(batch))
+            for idx, vector in zip(batch, vectors):
+                embeddings[idx] = vector.tolist()
+
+    if cache is not None:
+        if missing:
+            cache.put_many({keys[idx]: embeddings[idx] for idx in missing})
+        logger.info(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses "
+                    f"(total {cache.hits} hits, {cache.misses} misses)")
+    return embeddings
+
+
+def chunk_id(name, level, parent_id, occurrence, text):
+    """
+    Derives a stable point id from the chunk content and its position in the hierarchy.
+
+    Identical content always maps to the same id, which lets re-ingestion
+    diff the chunks of a document against what is already indexed.
+
+    Args:
+        name (str): Document name.
+        level (str): "large" or "small".
+        parent_id (str | None): Id of the parent large chunk for small chunks.
+        occurrence (int): Number of identical chunks seen before this one in the document.
+        text (str): Chunk text.
+
+    Returns:
+        str: UUID string usable as a Qdrant point id.
+    """
+    return str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{name}\0{level}\0{parent_id}\0{occurrence}\0{text}"))
+
+
+def split_document(text, name):
+    """
+    Splits document text into large chunks and the small chunks they contain.
+
+    Args:
+        text (str): Document text.
+        name (str): Document name (part of the chunk ids).
+
+    Returns:
+        list[Chunk]: Large chunks followed by small chunks.
     """
-    logger.info(f"chunking {input_file}")
     small_chunk_size = 300
     small_chunk_overlap = 80
     large_chunk_size = 2500
@@ -53,54 +124,88 @@ def chunking(input_file, name):
         chunk_overlap=small_chunk_overlap,
         separators=['\n\nГлава ', '\n\nРаздел ', '\n\nСтатья ', '\nПункт ', '\n\n', '\n'])
 
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            text = f.read()
-    except FileNotFoundError:
-        print(f"Ошибка: файл {input_file} не найден!")
-        return
-
-
     large_chunks = large_splitter.split_text(text)
 
-    points_small = []
-    points_large = []
-    model = get_model()
-    i = 0
-    for large_id, large_chunk in enumerate(large_chunks):
+    large_entries = []
+    small_entries = []
+    occurrences = Counter()
+    for large_chunk in large_chunks:
         if len(large_chunk) < small_chunk_size * 2:
             small_chunks = [large_chunk]
         else:
             small_chunks = small_splitter.split_text(large_chunk)
 
-        large_embedding = model.encode(large_chunk).tolist()
+        occurrences[("large", None, large_chunk)] += 1
+        large_id = chunk_id(name, "large", None, occurrences[("large", None, large_chunk)], large_chunk)
+        large_entries.append(Chunk(large_id, large_chunk, large_id, "large"))
+
+        for small_chunk in small_chunks:
+            occurrences[("small", large_id, small_chunk)] += 1
+            small_id = chunk_id(name, "small", large_id, occurrences[("small", large_id, small_chunk)], small_chunk)
+            small_entries.append(Chunk(small_id, small_chunk, large_id, "small"))
+
+    return large_entries + small_entries
+
+
+def build_points(chunks, name):
+    """
+    Computes embeddings for chunks and wraps them into Qdrant points.
+
+    Args:
+        chunks (list[Chunk]): Chunks produced by :func:`split_document`.
+        name (str): Document name (used in the payload of points).
 
-        points_large.append(PointStruct(
-            id=i,
-            vector=large_embedding,
+    Returns:
+        dict: {"Large": list of PointStruct, "Small": list of PointStruct}.
+    """
+    embeddings = encode_texts([chunk.text for chunk in chunks])
+
+    points = {"Large": [], "Small": []}
+    for chunk, embedding in zip(chunks, embeddings):
+        points["Large" if chunk.level == "large" else "Small"].append(PointStruct(
+            id=chunk.id,
+            vector=embedding,
             payload={
                 "document_name": name,
-                "text": large_chunk,
-                "parent_id": i
+                "text": chunk.text,
+                "parent_id": chunk.parent_id,
+                "level": chunk.level
             }
         ))
-        large_id = i
-        i += 1
+    return points
 
-        for small_chunk in small_chunks:
-            small_embedding = model.encode(small_chunk).tolist()
-            points_small.append(PointStruct(
-                id=i,
-                vector=small_embedding,
-                payload={
-                    "document_name": name,
-                    "text": small_chunk,
-                    "parent_id": large_id
-                }
-            ))
-            i += 1
-    logger.info(f"chunking {input_file} done")
-    return {"Large": points_large, "Small": points_small}
+
+def chunking(input_file, name):
+    """
+    Splits a text file into large and small chunks,
+    computes their embeddings, and creates point lists for indexing.
+
+    All chunk texts of the document are collected first and encoded
+    together by :func:`encode_texts`.
+
+    Args:
+        input_file (str): Path to the text file to be processed.
+        name (str): Document name (used in the payload of points).
+
+    Returns:
+        dict: Dictionary with two lists of points:
+            {
+                "Large": list of PointStruct for large chunks,
+                "Small": list of PointStruct for small chunks
+            }
+        Returns None if the file is not found.
+    """
+    logger.info(f"chunking {input_file}")
+    try:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except FileNotFoundError:
+        print(f"Ошибка: файл {input_file} не найден!")
+        return
+
+    points = build_points(split_document(text, name), name)
+    logger.info(f"chunking {input_file} done: {len(points['Large'])} large, {len(points['Small'])} small chunks")
+    return points
 
 
 def knowledge_base_runner(directory):
@@ -132,3 +237,75 @@ def knowledge_base_runner(directory):
     return txt_files
 
 
+def zip_knowledge_base(zip_path):
+    """
+    Lists the text files of a knowledge base ZIP archive without extracting it.
+
+    The archive is checked against size limits first, so that a malicious
+    or broken archive is rejected before anything is decompressed.
+
+    Args:
+        zip_path (str): Path to the ZIP archive.
+
+    Returns:
+        dict: Dictionary where the key is the filename without .txt,
+              and the value is a :class:`ZipMember` to pass to :func:`open_document`.
+
+    Raises:
+        ValueError: If the archive exceeds KB_ZIP_MAX_MEMBER_BYTES,
+            KB_ZIP_MAX_TOTAL_BYTES or KB_ZIP_MAX_RATIO.
+        zipfile.BadZipFile: If the file is not a ZIP archive.
+    """
+    txt_files = {}
+    total_size = 0
+    with zipfile.ZipFile(zip_path) as archive:
+        for info in archive.infolist():
+            file = os.path.basename(info.filename)
+            if info.is_dir() or not file.endswith(".txt") or file.startswith("._"):
+                continue
+            if info.file_size > KB_ZIP_MAX_MEMBER_BYTES:
+                raise ValueError(f"{info.filename}: file is larger than {KB_ZIP_MAX_MEMBER_BYTES} bytes")
+            if info.compress_size and info.file_size / info.compress_size > KB_ZIP_MAX_RATIO:
+                raise ValueError(f"{info.filename}: compression ratio exceeds {KB_ZIP_MAX_RATIO}")
+            total_size += info.file_size
+            if total_size > KB_ZIP_MAX_TOTAL_BYTES:
+                raise ValueError(f"Archive content is larger than {KB_ZIP_MAX_TOTAL_BYTES} bytes")
+            txt_files[file[:-4]] = ZipMember(zip_path, info.filename)
+
+    logger.info(f"zip_knowledge_base: Found {len(txt_files)} files in {zip_path}")
+    return txt_files
+
+
+@contextmanager
+def open_document(source):
+    """
+    Opens a knowledge base document for binary reading.
+
+    Args:
+        source (str | ZipMember): File path from :func:`knowledge_base_runner`
+            or archive member from :func:`zip_knowledge_base`.
+
+    Yields:
+        BinaryIO: Readable file object.
+    """
+    if isinstance(source, ZipMember):
+        with zipfile.ZipFile(source.zip_path) as archive, archive.open(source.name) as f:
+            yield f
+    else:
+        with open(source, "rb") as f:
+            yield f
+
+
+def read_document(source):
+    """
+    Reads the text of a knowledge base document.
+
+    Args:
+        source (str | ZipMember): See :func:`open_document`.
+
+    Returns:
+        str: Document text.
+    """
+    with open_document(source) as f:
+        return f.read().decode("utf-8")
+
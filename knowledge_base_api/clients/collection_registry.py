@@ -0,0 +1,65 @@
+import asyncio
+import os
+import time
+from collections import namedtuple
+
+from knowledge_base_api.clients.qdrant_pool import get_client
+from knowledge_base_api.clients.qdrant_sender import searchable_collections
+
+import logging
+logger = logging.getLogger(__name__)
+
+COLLECTION_REGISTRY_TTL = float(os.getenv("COLLECTION_REGISTRY_TTL", 300))
+
+CollectionEntry = namedtuple('CollectionEntry', 'name collection vector_size points_count')
+
+_entries = None
+_loaded_at = 0.0
+_lock = asyncio.Lock()
+
+
+async def refresh():
+    """
+    Reloads the registry of searchable collections from Qdrant.
+
+    Returns:
+        list[CollectionEntry]: Searchable collections with vector size and point count.
+    """
+    global _entries, _loaded_at
+    client = await get_client()
+    searchable = await searchable_collections(client)
+    infos = await asyncio.gather(*(client.get_collection(collection) for collection in searchable.values()))
+
+    entries = []
+    for (name, collection), info in zip(searchable.items(), infos):
+        vectors = info.config.params.vectors
+        entries.append(CollectionEntry(
+            name=name,
+            collection=collection,
+            vector_size=getattr(vectors, "size", None),
+            points_count=info.points_count
+        ))
+    _entries, _loaded_at = entries, time.monotonic()
+    logger.info(f"Collection registry loaded: {len(entries)} collections")
+    return entries
+
+
+async def get_collections():
+    """
+    Returns the searchable collections, reloading them when invalidated or older than the TTL.
+
+    Returns:
+        list[CollectionEntry]: Searchable collections.
+    """
+    if _entries is not None and time.monotonic() - _loaded_at < COLLECTION_REGISTRY_TTL:
+        return _entries
+    async with _lock:
+        if _entries is not None and time.monotonic() - _loaded_at < COLLECTION_REGISTRY_TTL:
+            return _entries
+        return await refresh()
+
+
+def invalidate():
+    """Drops the cached registry; the next :func:`get_collections` call reloads it."""
+    global _entries
+    _entries = None
@@ -0,0 +1,109 @@
+import asyncio
+import os
+from asyncio import to_thread
+
+import logging
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", 5))
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", 16))
+
+
+class EmbeddingBatcher:
+    """
+    Groups concurrently requested query embeddings into shared ``encode`` calls.
+
+    A single worker task collects queries that arrive within ``window_ms`` of
+    the first one (or until ``max_batch_size`` is reached), encodes them in
+    one forward pass on a worker thread and resolves the waiting futures.
+    Queries arriving while a batch is being encoded form the next batch.
+    """
+
+    def __init__(self, encode, window_ms=EMBEDDING_BATCH_WINDOW_MS, max_batch_size=EMBEDDING_BATCH_MAX_SIZE):
+        """
+        Args:
+            encode (callable): Blocking function mapping a list of texts to a list of embeddings.
+            window_ms (float): How long to wait for more queries after the first one.
+            max_batch_size (int): Maximum number of texts per ``encode`` call.
+        """
+        self._encode = encode
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue = None
+        self._worker = None
+        self._batch = []
+
+    async def encode(self, text):
+        """
+        Schedules a text for the next batch and waits for its embedding.
+
+        Args:
+            text (str): Text to encode.
+
+        Returns:
+            numpy.ndarray: Embedding of the text.
+        """
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect(self):
+        """Waits for the first request, then gathers more until the window closes or the batch is full."""
+        # Kept on the instance so that close() can fail the requests of a batch in progress
+        self._batch = batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.window
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                embeddings = await to_thread(self._encode, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            by_text = dict(zip(texts, embeddings))
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(by_text[text])
+            if len(batch) > 1:
+                logger.debug(f"Encoded {len(texts)} queries for {len(batch)} requests in one batch")
+            self._batch = []
+
+    async def close(self):
+        """
+        Stops the worker task.
+
+        Requests that are queued or part of the batch being encoded fail
+        with ``RuntimeError`` instead of waiting forever.
+        """
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        pending = [future for _, future in self._batch]
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait()[1])
+        self._batch = []
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Embedding batcher closed"))
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+
+import logging
+logger = logging.getLogger(__name__)
+
+CONTEXT_DIR = os.getenv("CONTEXT_DIR",
+                        os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "context")))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(CONTEXT_DIR, "embedding_cache.sqlite3"))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 100_000))
+
+
+def normalize_text(text):
+    """
+    Normalizes chunk text before hashing: Unicode NFC and collapsed whitespace.
+
+    Args:
+        text (str): Chunk text.
+
+    Returns:
+        str: Normalized text.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model_name, text):
+    """
+    Builds the content address of an embedding.
+
+    Args:
+        model_name (str): Name of the embedding model.
+        text (str): Chunk text.
+
+    Returns:
+        str: Hex SHA-256 of the model name and the normalized text.
+    """
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent content-addressed embedding store backed by SQLite.
+
+    Entries are keyed by :func:`cache_key` and evicted least-recently-used
+    first once the store grows beyond ``max_entries``.
+    """
+
+    def __init__(self, path, max_entries):
+        """
+        Args:
+            path (str): Path to the SQLite database file.
+            max_entries (int): Maximum number of embeddings kept on disk.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+    def get_many(self, keys):
+        """
+        Looks up embeddings for the given keys and refreshes their LRU position.
+
+        Args:
+            keys (list[str]): Cache keys.
+
+        Returns:
+            dict: Mapping of found keys to embeddings (list[float]).
+        """
+        found = {}
+        unique_keys = list(set(keys))
+        with self._lock:
+            # SQLite limits the number of bound parameters per statement
+            for start in range(0, len(unique_keys), 500):
+                part = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32).tolist()
+            now = time.time()
+            self._conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                   [(now, key) for key in found])
+            self._conn.commit()
+        self.hits += sum(1 for key in keys if key in found)
+        self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, items):
+        """
+        Stores embeddings and evicts the least recently used ones above the size bound.
+
+        Args:
+            items (dict): Mapping of cache keys to embeddings.
+        """
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items.items()]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                                   rows)
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+                logger.info(f"Embedding cache: evicted {count - self.max_entries} entries")
+            self._conn.commit()
+
+
+@lru_cache(maxsize=None)
+def get_embedding_cache():
+    """
+    Opens the process-wide embedding cache.
+
+    Returns:
+        EmbeddingCache | None: The cache, or None when disabled with EMBEDDING_CACHE_MAX_ENTRIES=0.
+    """
+    if EMBEDDING_CACHE_MAX_ENTRIES <= 0:
+        return None
+    logger.info(f"Embedding cache at {EMBEDDING_CACHE_PATH}, max entries: {EMBEDDING_CACHE_MAX_ENTRIES}")
+    return EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES)
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import time
+
+from knowledge_base_api.clients.chunking import open_document
+from knowledge_base_api.clients.embedding_cache import CONTEXT_DIR
+
+import logging
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = os.getenv("KB_MANIFEST_PATH", os.path.join(CONTEXT_DIR, "manifest.json"))
+KB_VERSION_PATH = os.path.join(CONTEXT_DIR, "kb_version")
+
+
+def file_fingerprint(source):
+    """
+    Computes the SHA-256 fingerprint of a knowledge base file.
+
+    Args:
+        source (str | ZipMember): Path to the file or ZIP archive member.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open_document(source) as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest():
+    """
+    Loads the manifest of indexed documents.
+
+    Returns:
+        dict: Mapping of document name to
+            {"fingerprint": str, "point_ids": list[str], "collection": str}.
+            Empty if nothing has been indexed yet.
+    """
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable manifest {MANIFEST_PATH}: {e}")
+        return {}
+
+
+def save_manifest(manifest):
+    """
+    Atomically writes the manifest of indexed documents.
+
+    Args:
+        manifest (dict): Manifest in the format returned by :func:`load_manifest`.
+    """
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def get_kb_version():
+    """
+    Reads the knowledge base version stamp.
+
+    Returns:
+        str: Version written by the last successful renew, "0" if there was none.
+    """
+    try:
+        with open(KB_VERSION_PATH, "r", encoding="utf-8") as f:
+            return f.read().strip() or "0"
+    except FileNotFoundError:
+        return "0"
+
+
+def bump_kb_version():
+    """
+    Atomically writes a new knowledge base version stamp.
+
+    Returns:
+        str: New version.
+    """
+    version = str(time.time_ns())
+    os.makedirs(os.path.dirname(KB_VERSION_PATH), exist_ok=True)
+    tmp_path = f"{KB_VERSION_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, KB_VERSION_PATH)
+    return version
+
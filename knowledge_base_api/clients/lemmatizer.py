@@ -0,0 +1,149 @@
+"""
+Sentence splitting and lemmatisation of Russian text.
+
+Kept free of the embedding model and gensim imports: the corpus
+preprocessing pool spawns workers that import only this module.
+"""
+import inspect
+import logging
+import os
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from knowledge_base_api.clients.stopwords_ru import RUSSIAN_STOPWORDS
+
+logger = logging.getLogger(__name__)
+
+# Monkey-patch for pymorphy2 compatibility on Python >=3.11
+# Provide getargspec signature that matches argparse
+ArgSpec = namedtuple('ArgSpec', 'args varargs varkw defaults')
+
+
+def getargspec(func):
+    """
+    Compatibility patch for pymorphy2 on Python 3.11+, replaces inspect.getargspec.
+
+    Args:
+        func (callable): Function to analyze.
+
+    Returns:
+        ArgSpec: Named tuple with function arguments.
+    """
+    spec = inspect.getfullargspec(func)
+    return ArgSpec(args=spec.args, varargs=spec.varargs, varkw=spec.varkw, defaults=spec.defaults)
+
+
+inspect.getargspec = getargspec
+
+import nltk
+from nltk.corpus import stopwords
+from nltk.data import find
+from nltk.tokenize import sent_tokenize
+from pymorphy2 import MorphAnalyzer
+
+LEMMA_CACHE_SIZE = int(os.getenv("LEMMA_CACHE_SIZE", 200_000))
+
+
+def _load_stop_words():
+    """
+    Resolves the Russian stop words once per process, without network access.
+
+    Returns:
+        frozenset[str]: NLTK Russian stop words, or the bundled copy if NLTK data is not installed.
+    """
+    try:
+        return frozenset(stopwords.words('russian'))
+    except LookupError:
+        logger.warning("NLTK stopwords are not installed, using the bundled Russian list")
+        return RUSSIAN_STOPWORDS
+
+
+def _has_punkt():
+    """Checks whether the NLTK Punkt sentence tokenizer data is installed."""
+    try:
+        find('tokenizers/punkt_tab/russian/')
+        return True
+    except LookupError:
+        logger.warning("NLTK punkt_tab is not installed, using the regex sentence splitter")
+        return False
+
+
+# Data downloaded into the package directory is used in addition to the system NLTK paths
+nltk_dir = os.path.join(os.path.dirname(__file__), "nltk")
+if nltk_dir not in nltk.data.path:
+    nltk.data.path.append(nltk_dir)
+STOP_WORDS = _load_stop_words()
+HAS_PUNKT = _has_punkt()
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?…])\s+')
+
+
+def split_sentences(text):
+    """
+    Splits Russian text into sentences with NLTK Punkt, or by sentence-ending punctuation
+    if Punkt data is not available.
+
+    Args:
+        text (str): Input text.
+
+    Returns:
+        list[str]: Sentences.
+    """
+    if HAS_PUNKT:
+        return sent_tokenize(text, language='russian')
+    return [sentence for sentence in _SENTENCE_END_RE.split(text) if sentence.strip()]
+
+
+@lru_cache(maxsize=None)
+def get_morph():
+    """
+    Load and cache the pymorphy2 analyzer (one per process).
+
+    Returns:
+        MorphAnalyzer: Initialized analyzer with the Russian dictionaries.
+    """
+    return MorphAnalyzer()
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def normal_form(word):
+    """
+    Returns the normal form of a lowercase word, memoised per process.
+
+    Args:
+        word (str): Lowercase word.
+
+    Returns:
+        str: Lemma of the word.
+    """
+    return get_morph().parse(word)[0].normal_form
+
+
+def lemmatize_ru(text):
+    """
+    Lemmatizes Russian text and returns a list of normalized words.
+
+    Args:
+        text (str): Input text.
+
+    Returns:
+        list[str]: List of lemmas (normalized word forms).
+    """
+    words = re.findall(r'\b\w+\b', text.lower())
+    lemmas = [normal_form(word) for word in words]
+    return lemmas
+
+
+def preprocess(sentence):
+    """
+    Preprocesses a sentence: lemmatization, stop-word and non-alphabetic token filtering.
+
+    Args:
+        sentence (str): Input sentence.
+
+    Returns:
+        list[str]: List of cleaned and lemmatized words.
+    """
+    words = lemmatize_ru(sentence)
+    filtered_words = [word for word in words if word.isalpha() and word not in STOP_WORDS]
+    return filtered_words
@@ -0,0 +1,130 @@
+import asyncio
+import os
+from qdrant_client import AsyncQdrantClient
+
+import logging
+logger = logging.getLogger(__name__)
+
+QDRANT_HEALTHCHECK_INTERVAL = float(os.getenv("QDRANT_HEALTHCHECK_INTERVAL", 30))
+QDRANT_TIMEOUT = 120
+# A replaced client stays open this long so that calls already made through it
+# can finish; longer than QDRANT_TIMEOUT, after which they fail anyway.
+QDRANT_RECONNECT_GRACE = float(os.getenv("QDRANT_RECONNECT_GRACE", QDRANT_TIMEOUT + 10))
+
+_client = None
+_retiring = set()
+
+
+def _create_client():
+    """Creates an AsyncQdrantClient for the configured Qdrant instance."""
+    return AsyncQdrantClient(
+        host=os.getenv("QDRANT_HOST", "qdrant"),  # <— сейчас docker-dns имя
+        port=int(os.getenv("QDRANT_PORT", 6333)),
+        prefer_grpc=True,
+        timeout=QDRANT_TIMEOUT
+    )
+
+
+async def get_client():
+    """
+    Returns the process-wide Qdrant client, creating it on first use.
+
+    The client (and its gRPC channel) is shared by search and ingestion
+    and must not be closed by callers.
+
+    Returns:
+        AsyncQdrantClient: Shared client.
+    """
+    global _client
+    if _client is None:
+        _client = _create_client()
+        logger.info("Qdrant client created")
+    return _client
+
+
+async def _close_quietly(client):
+    try:
+        await client.close()
+    except Exception as e:
+        logger.warning(f"Error closing stale Qdrant client: {e}")
+
+
+async def _retire(client, grace):
+    """Closes a replaced client once the calls still running on it have had time to finish."""
+    try:
+        await asyncio.sleep(grace)
+    finally:
+        await _close_quietly(client)
+
+
+async def reconnect(grace=QDRANT_RECONNECT_GRACE):
+    """
+    Replaces the shared client with a freshly connected one.
+
+    New callers get the new client right away; the old one is closed only
+    after ``grace`` seconds, so requests in flight on it are not cut off.
+
+    Args:
+        grace (float): Seconds to keep the old client open.
+
+    Returns:
+        AsyncQdrantClient: New shared client.
+    """
+    global _client
+    old_client, _client = _client, _create_client()
+    logger.info("Qdrant client reconnected")
+    if old_client is not None:
+        task = asyncio.create_task(_retire(old_client, grace))
+        _retiring.add(task)
+        task.add_done_callback(_retiring.discard)
+    return _client
+
+
+async def check_health():
+    """
+    Pings Qdrant through the shared client and reconnects if the ping fails.
+
+    Returns:
+        bool: True if Qdrant answered (possibly after reconnecting).
+    """
+    client = await get_client()
+    try:
+        await client.get_collections()
+        return True
+    except Exception as e:
+        logger.warning(f"Qdrant health check failed: {e}. Reconnecting")
+    client = await reconnect()
+    try:
+        await client.get_collections()
+        return True
+    except Exception as e:
+        logger.error(f"Qdrant is unavailable: {e}")
+        return False
+
+
+async def health_check_loop(interval=QDRANT_HEALTHCHECK_INTERVAL):
+    """
+    Periodically checks the shared client until cancelled.
+
+    Args:
+        interval (float): Seconds between checks.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        await check_health()
+
+
+async def close_client():
+    """
+    Closes the shared client and any replaced clients still waiting out their
+    grace period; the next :func:`get_client` call creates a new one.
+    """
+    global _client
+    for task in list(_retiring):
+        task.cancel()
+    # Cancelling _retire closes its client right away
+    await asyncio.gather(*_retiring, return_exceptions=True)
+    if _client is not None:
+        await _client.close()
+        _client = None
+        logger.info("Qdrant client closed")
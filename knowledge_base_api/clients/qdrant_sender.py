@@ -1,9 +1,28 @@
 import asyncio
 import os
-from qdrant_client import AsyncQdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+import re
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, PointIdsList,
+    CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation,
+    Filter, FieldCondition, MatchValue, HasIdCondition, FilterSelector, PayloadSchemaType,
+)
 from itertools import islice
 
+from knowledge_base_api.clients.qdrant_pool import get_client
+
+import logging
+logger = logging.getLogger(__name__)
+
+VERSIONED_NAME_RE = re.compile(r"^(?P<name>.+)__v(?P<version>\d+)$")
+# Collections of other services on the same Qdrant (e.g. the assistant's
+# answer cache) start with this prefix and are never searched.
+SERVICE_COLLECTION_PREFIX = "__"
+
+# "per_document": one collection per knowledge base file;
+# "unified": all files in one collection filtered by payload.
+KB_INDEX_LAYOUT = os.getenv("KB_INDEX_LAYOUT", "per_document")
+KB_UNIFIED_COLLECTION = os.getenv("KB_UNIFIED_COLLECTION", "knowledge_base")
+
 
 def batched(iterable, batch_size):
     """
@@ -21,41 +40,79 @@ def batched(iterable, batch_size):
         yield batch
 
 
+def versioned_name(name, version):
+    """Returns the name of a physical collection version behind the alias ``name``."""
+    return f"{name}__v{version}"
+
+
+async def searchable_collections(client):
+    """
+    Resolves the names under which documents can be searched.
+
+    Every document is served through an alias pointing at its current
+    ``<name>__v<N>`` collection. Collections created before aliases were
+    introduced are searched directly; versioned collections that no alias
+    points to are still being built (or are leftovers) and are skipped, as
+    are collections named with :data:`SERVICE_COLLECTION_PREFIX`.
+
+    Args:
+        client: AsyncQdrantClient instance.
+
+    Returns:
+        dict: Mapping of searchable name to the physical collection name.
+    """
+    aliases = (await client.get_aliases()).aliases
+    searchable = {alias.alias_name: alias.collection_name for alias in aliases}
+
+    collections = (await client.get_collections()).collections
+    for col in collections:
+        if (not VERSIONED_NAME_RE.match(col.name) and not col.name.startswith(SERVICE_COLLECTION_PREFIX)
+                and col.name not in searchable):
+            searchable[col.name] = col.name
+    return searchable
+
+
 async def async_send(filechunks, filename, rewrite=False):
     """
     Asynchronously sends embeddings from chunks to a Qdrant collection.
 
-    If a collection with the given name already exists, it will either be deleted and recreated,
-    or skipped depending on the `rewrite` flag.
+    The points are loaded into a new shadow collection ``<filename>__v<N>``
+    and, once every upsert has been acknowledged, the alias ``<filename>``
+    is atomically switched to it, so searches never see a partially loaded
+    collection. Older versions are deleted afterwards.
+    If the alias already exists, the data is either reloaded or skipped
+    depending on the `rewrite` flag.
 
     Args:
         filechunks (dict): Dictionary with "Large" and "Small" keys containing lists of points (PointStruct or dict).
-        filename (str): Name of the Qdrant collection to store the data.
-        rewrite (bool, optional): If True, deletes the existing collection before loading data. Defaults to False.
+        filename (str): Name of the Qdrant alias to store the data under.
+        rewrite (bool, optional): If True, replaces the existing collection. Defaults to False.
+
+    Returns:
+        bool: True if the points were loaded into the collection.
 
     Raises:
         Exception: Propagates exceptions encountered during interaction with Qdrant.
     """
-    client = AsyncQdrantClient(
-        host=os.getenv("QDRANT_HOST", "qdrant"),  # <— сейчас docker-dns имя
-        port=int(os.getenv("QDRANT_PORT", 6333)),
-        prefer_grpc=True,
-        timeout=120
-    )
+    client = await get_client()
 
     size = 1024
-    collection_name = filename
+    alias_name = filename
+    collection_name = None
 
     try:
-        existing_collections = await client.get_collections()
-        exists = any(col.name == collection_name for col in existing_collections.collections)
+        searchable = await searchable_collections(client)
+        if alias_name in searchable and not rewrite:
+            print(f"Collection {alias_name} exists. passing")
+            return False
 
-        if exists:
-            if rewrite:
-                await client.delete_collection(collection_name)
-            else:
-                print(f"Collection {collection_name} exists. passing")
-                return
+        existing_collections = await client.get_collections()
+        versions = [
+            int(match.group("version"))
+            for col in existing_collections.collections
+            if (match := VERSIONED_NAME_RE.match(col.name)) and match.group("name") == alias_name
+        ]
+        collection_name = versioned_name(alias_name, max(versions, default=0) + 1)
 
         await client.create_collection(
             collection_name=collection_name,
@@ -70,7 +127,7 @@ async def async_send(filechunks, filename, rewrite=False):
             await client.upsert(
                 collection_name=collection_name,
                 points=converted,
-                wait=False
+                wait=True
             )
 
         tasks = []
@@ -82,7 +139,186 @@ async def async_send(filechunks, filename, rewrite=False):
 
         await asyncio.gather(*tasks)
 
+        operations = []
+        if searchable.get(alias_name) == alias_name:
+            # A collection created before aliases occupies the name; it has to go
+            # before the alias can be created.
+            logger.info(f"Replacing legacy collection {alias_name} with alias")
+            await client.delete_collection(alias_name)
+        elif alias_name in searchable:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias_name)))
+        operations.append(CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=collection_name, alias_name=alias_name)
+        ))
+        await client.update_collection_aliases(change_aliases_operations=operations)
+        logger.info(f"Alias {alias_name} now points to {collection_name}")
+
+        for version in versions:
+            await client.delete_collection(versioned_name(alias_name, version))
+        return True
+
     except Exception as e:
-        print(f"Error processing {collection_name}: {str(e)}")
-    finally:
-        await client.close()
+        print(f"Error processing {alias_name}: {str(e)}")
+        if collection_name is not None:
+            try:
+                aliases = (await client.get_aliases()).aliases
+                if not any(alias.collection_name == collection_name for alias in aliases):
+                    await client.delete_collection(collection_name)
+            except Exception as cleanup_error:
+                logger.error(f"Failed to clean up {collection_name}: {cleanup_error}")
+        return False
+
+
+async def async_list_collections():
+    """
+    Lists the names under which documents are stored in Qdrant.
+
+    Returns:
+        set[str]: Alias names and legacy collection names.
+    """
+    client = await get_client()
+    return set(await searchable_collections(client))
+
+
+async def async_send_delta(filechunks, removed_ids, collection_name):
+    """
+    Applies an incremental update to an existing Qdrant collection.
+
+    New points are upserted first and waited for, only then the vanished
+    points are deleted, so the collection never lacks a chunk that is
+    still part of the document.
+
+    Args:
+        filechunks (dict): Dictionary with "Large" and "Small" keys containing the new points.
+        removed_ids (list[str]): Ids of the points that are no longer part of the document.
+        collection_name (str): Name of the Qdrant collection or alias.
+
+    Raises:
+        Exception: Propagates exceptions encountered during interaction with Qdrant.
+    """
+    client = await get_client()
+    tasks = [
+        client.upsert(collection_name=collection_name, points=batch, wait=True)
+        for batch in batched(filechunks["Large"] + filechunks["Small"], 500)
+    ]
+    await asyncio.gather(*tasks)
+
+    for batch in batched(removed_ids, 1000):
+        await client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=batch),
+            wait=True
+        )
+
+
+def target_collection(name):
+    """
+    Returns the collection (alias) that stores the points of a document
+    for the configured index layout.
+
+    Args:
+        name (str): Document name.
+
+    Returns:
+        str: Collection or alias name.
+    """
+    return KB_UNIFIED_COLLECTION if KB_INDEX_LAYOUT == "unified" else name
+
+
+async def ensure_unified_collection():
+    """
+    Creates the unified collection behind its alias if it does not exist yet,
+    with keyword payload indexes on ``document_name``, ``level`` and ``parent_id``.
+    """
+    client = await get_client()
+    if KB_UNIFIED_COLLECTION in await searchable_collections(client):
+        return
+
+    collection_name = versioned_name(KB_UNIFIED_COLLECTION, 1)
+    logger.info(f"Creating unified collection {collection_name}")
+    await client.create_collection(
+        collection_name=collection_name,
+        vectors_config=VectorParams(size=1024, distance=Distance.DOT)
+    )
+    for field_name in ("document_name", "level", "parent_id"):
+        await client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=PayloadSchemaType.KEYWORD,
+            wait=True
+        )
+    await client.update_collection_aliases(change_aliases_operations=[CreateAliasOperation(
+        create_alias=CreateAlias(collection_name=collection_name, alias_name=KB_UNIFIED_COLLECTION)
+    )])
+
+
+async def async_replace_document(filechunks, name, collection_name=KB_UNIFIED_COLLECTION):
+    """
+    Replaces all points of one document in a shared collection.
+
+    The new points are upserted first; afterwards every other point with the
+    same ``document_name`` is deleted. Unchanged chunks keep their ids, so
+    the document stays searchable during the whole update.
+
+    Args:
+        filechunks (dict): Dictionary with "Large" and "Small" keys containing the points of the document.
+        name (str): Document name.
+        collection_name (str): Name of the shared collection or alias.
+
+    Raises:
+        Exception: Propagates exceptions encountered during interaction with Qdrant.
+    """
+    await async_send_delta(filechunks, [], collection_name)
+
+    client = await get_client()
+    point_ids = [point.id for point in filechunks["Large"] + filechunks["Small"]]
+    await client.delete(
+        collection_name=collection_name,
+        points_selector=FilterSelector(filter=Filter(
+            must=[FieldCondition(key="document_name", match=MatchValue(value=name))],
+            must_not=[HasIdCondition(has_id=point_ids)]
+        )),
+        wait=True
+    )
+
+
+async def async_delete_document(name, collection_name):
+    """
+    Removes a document from Qdrant.
+
+    A document stored in its own collection loses its alias and every
+    version of the collection behind it; in a shared collection only the
+    points with its ``document_name`` are deleted.
+
+    Args:
+        name (str): Document name.
+        collection_name (str): Collection or alias the document is stored in,
+            as recorded in the manifest.
+
+    Raises:
+        Exception: Propagates exceptions encountered during interaction with Qdrant.
+    """
+    client = await get_client()
+    if collection_name != name:
+        await client.delete(
+            collection_name=collection_name,
+            points_selector=FilterSelector(filter=Filter(
+                must=[FieldCondition(key="document_name", match=MatchValue(value=name))]
+            )),
+            wait=True
+        )
+        return
+
+    searchable = await searchable_collections(client)
+    if searchable.get(name) == name:
+        await client.delete_collection(name)
+        return
+    if name in searchable:
+        # Searches stop seeing the document before its data goes away
+        await client.update_collection_aliases(change_aliases_operations=[
+            DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=name))
+        ])
+    for col in (await client.get_collections()).collections:
+        match = VERSIONED_NAME_RE.match(col.name)
+        if match and match.group("name") == name:
+            await client.delete_collection(col.name)
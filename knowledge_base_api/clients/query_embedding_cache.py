@@ -0,0 +1,95 @@
+import os
+import threading
+from collections import OrderedDict
+
+from knowledge_base_api.clients.embedding_cache import normalize_text
+
+import logging
+logger = logging.getLogger(__name__)
+
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 10_000))
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+QUERY_CACHE_LOG_EVERY = 100
+
+
+class QueryEmbeddingCache:
+    """
+    In-memory LRU of normalized query text -> embedding, bounded by entry count and bytes.
+    """
+
+    def __init__(self, max_entries, max_bytes):
+        """
+        Args:
+            max_entries (int): Maximum number of cached queries.
+            max_bytes (int): Maximum total size of cached keys and embeddings.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(text):
+        return normalize_text(text).lower()
+
+    @staticmethod
+    def _entry_size(key, embedding):
+        return len(key.encode("utf-8")) + embedding.nbytes
+
+    @property
+    def hit_rate(self):
+        """float: Share of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, text):
+        """
+        Looks up the embedding of a query.
+
+        Args:
+            text (str): Query text.
+
+        Returns:
+            numpy.ndarray | None: Cached embedding or None on a miss.
+        """
+        key = self._key(text)
+        with self._lock:
+            embedding = self._items.get(key)
+            if embedding is None:
+                self.misses += 1
+            else:
+                self._items.move_to_end(key)
+                self.hits += 1
+            lookups = self.hits + self.misses
+        if lookups % QUERY_CACHE_LOG_EVERY == 0:
+            logger.info(f"Query embedding cache: {self.hits}/{lookups} hits ({self.hit_rate:.1%}), "
+                        f"{len(self._items)} entries, {self._size} bytes")
+        return embedding
+
+    def put(self, text, embedding):
+        """
+        Stores the embedding of a query, evicting the least recently used entries if needed.
+
+        Args:
+            text (str): Query text.
+            embedding (numpy.ndarray): Query embedding.
+        """
+        key = self._key(text)
+        size = self._entry_size(key, embedding)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._size -= self._entry_size(key, previous)
+            self._items[key] = embedding
+            self._size += size
+            while len(self._items) > self.max_entries or self._size > self.max_bytes:
+                old_key, old_embedding = self._items.popitem(last=False)
+                self._size -= self._entry_size(old_key, old_embedding)
+
+
+query_embedding_cache = QueryEmbeddingCache(QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_MAX_BYTES)
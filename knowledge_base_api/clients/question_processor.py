@@ -1,16 +1,41 @@
 import asyncio
 from asyncio import to_thread
-import os
-from qdrant_client import AsyncQdrantClient
+from collections import defaultdict
 import logging
 
 from knowledge_base_api.clients.chunking import get_model
+from knowledge_base_api.clients.embedding_batcher import EmbeddingBatcher
+from knowledge_base_api.clients import collection_registry
+from knowledge_base_api.clients.qdrant_pool import get_client
+from knowledge_base_api.clients.query_embedding_cache import query_embedding_cache
+from knowledge_base_api.clients.qdrant_sender import KB_INDEX_LAYOUT, KB_UNIFIED_COLLECTION
+from qdrant_client.models import Filter, FieldCondition, MatchValue, WithLookup
 
 logger = logging.getLogger(__name__)
 
-from knowledge_base_api.clients.question_synonimizer import lemmatize_ru, result_question
+from knowledge_base_api.clients.lemmatizer import lemmatize_ru
+from knowledge_base_api.clients.question_synonimizer import result_question
 
 model = get_model()
+query_batcher = EmbeddingBatcher(lambda texts: model.encode(texts, batch_size=len(texts)))
+
+async def embed_question(question):
+    """Return the embedding of a question, computing it only on a query cache miss.
+
+        Misses are encoded by the shared micro-batcher together with other
+        questions that arrive at the same time.
+
+        Args:
+            question: Question text.
+
+        Returns:
+            Embedding vector as a list of floats.
+        """
+    embedding = query_embedding_cache.get(question)
+    if embedding is None:
+        embedding = await query_batcher.encode(question)
+        query_embedding_cache.put(question, embedding)
+    return embedding.tolist()
 
 async def async_search(client, collection, question_embedding):
     """Perform an asynchronous similarity search on a Qdrant collection.
@@ -31,62 +56,114 @@ async def async_search(client, collection, question_embedding):
         with_payload=["parent_id"]
     )
 
+async def async_retrieve_texts(client, chunks):
+    """Fetch the texts of the given chunks with one retrieve request per collection.
+
+        Args:
+            client: AsyncQdrantClient instance.
+            chunks: List of (score, point_id, collection) tuples.
+
+        Returns:
+            List of chunk texts in the order of ``chunks``.
+        """
+    ids_by_collection = defaultdict(list)
+    for _, pid, col_name in chunks:
+        ids_by_collection[col_name].append(pid)
+
+    records = await asyncio.gather(*(
+        client.retrieve(collection_name=col_name, ids=ids, with_payload=["text"])
+        for col_name, ids in ids_by_collection.items()
+    ))
+
+    texts = {}
+    for col_name, col_records in zip(ids_by_collection, records):
+        for record in col_records:
+            texts[(col_name, str(record.id))] = record.payload["text"]
+    return [texts[(col_name, str(pid))] for _, pid, col_name in chunks if (col_name, str(pid)) in texts]
+
+async def async_search_unified(client, question_embedding):
+    """Search small chunks of the unified collection, grouped by parent chunk.
+
+        Qdrant deduplicates the hits by ``parent_id`` and looks up the parent
+        texts in the same request, so the whole retrieval is one round trip.
+
+        Args:
+            client: AsyncQdrantClient instance.
+            question_embedding: Embedding vector of the query.
+
+        Returns:
+            List of texts of the top 5 parent chunks.
+        """
+    result = await client.search_groups(
+        collection_name=KB_UNIFIED_COLLECTION,
+        query_vector=question_embedding,
+        query_filter=Filter(must=[FieldCondition(key="level", match=MatchValue(value="small"))]),
+        group_by="parent_id",
+        group_size=1,
+        limit=5,
+        score_threshold=0.25,
+        with_payload=False,
+        with_lookup=WithLookup(collection=KB_UNIFIED_COLLECTION, with_payload=["text"], with_vectors=False)
+    )
+    return [group.lookup.payload["text"] for group in result.groups if group.lookup is not None]
+
 async def question_preparation(question):
     """Prepare and perform a semantic search for the question across all Qdrant collections,
         then retrieve and concatenate the top 5 unique matching chunk texts.
 
+        The searches of all collections run as one concurrent wave, followed by
+        one wave of batched retrieves (a single request per collection), so a
+        question costs two sequential round trips regardless of the number of documents.
+        With the unified index layout it is a single grouped search.
+
         Args:
             question: User question text.
 
         Returns:
             Concatenated string of top relevant chunk texts.
     """
-    client = AsyncQdrantClient(
-        host=os.getenv("QDRANT_HOST", "qdrant"),
-        port=int(os.getenv("QDRANT_PORT", 6333)),
-        prefer_grpc=True
-    )
-    try:
-        collections = await client.get_collections()
-        collection_names = [c.name for c in collections.collections]
+    client = await get_client()
+    question_embedding = await embed_question(question)
 
-        embedding = await to_thread(model.encode, question)
-        question_embedding = embedding.tolist()
+    if KB_INDEX_LAYOUT == "unified":
+        return "\n".join(await async_search_unified(client, question_embedding))
 
-        tasks = [async_search(client, col, question_embedding)
-                 for col in collection_names]
+    # Search through aliases only: collections being rebuilt are not visible
+    collection_names = [entry.name for entry in await collection_registry.get_collections()]
+
+    tasks = [async_search(client, col, question_embedding)
+             for col in collection_names]
+    try:
         results = await asyncio.gather(*tasks)
+    except Exception:
+        # A collection may have disappeared since the registry was loaded
+        collection_registry.invalidate()
+        raise
 
-        top_chunks = []
-        seen_ids = set()
+    top_chunks = []
+    seen_ids = set()
 
-        for col_name, col_results in zip(collection_names, results):
-            for hit in col_results:
-                pid = hit.payload["parent_id"]
-                if pid not in seen_ids:
-                    seen_ids.add(pid)
-                    top_chunks.append((hit.score, pid, col_name))
+    for col_name, col_results in zip(collection_names, results):
+        for hit in col_results:
+            pid = hit.payload.get("parent_id")
+            if pid is None:
+                # Not a knowledge base chunk
+                continue
+            if (col_name, pid) not in seen_ids:
+                seen_ids.add((col_name, pid))
+                top_chunks.append((hit.score, pid, col_name))
 
-        top_chunks.sort(reverse=True, key=lambda x: x[0])
-        top5 = top_chunks[:5]
+    top_chunks.sort(reverse=True, key=lambda x: x[0])
+    top5 = top_chunks[:5]
 
-        retrieve_tasks = [
-            client.retrieve(
-                collection_name=item[2],
-                ids=[item[1]],
-                with_payload=["text"]
-            ) for item in top5
-        ]
-        texts = await asyncio.gather(*retrieve_tasks)
-    finally:
-        await client.close()
+    texts = await async_retrieve_texts(client, top5)
 
-    return "\n".join([t[0].payload["text"] for t in texts])
+    return "\n".join(texts)
 
 async def process_question(raw_question):
     lemmas = await to_thread(lemmatize_ru, raw_question)
     logger.info(f"Question lemmas: {lemmas}")
-    top_question = result_question(" ".join(lemmas))
+    top_question = await to_thread(result_question, " ".join(lemmas))
     logger.info(f"Top question: {top_question}")
     question = await question_preparation(top_question)
     return question
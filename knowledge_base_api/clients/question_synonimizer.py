@@ -1,109 +1,283 @@
-import inspect
 from collections import namedtuple
 import logging
-from os.path import abspath
-from knowledge_base_api.clients.chunking import knowledge_base_runner
+from knowledge_base_api.clients.chunking import knowledge_base_runner, read_document
 
 from knowledge_base_api.clients.ModelNotFoundError import ModelNotFoundError
+from knowledge_base_api.clients.lemmatizer import split_sentences, lemmatize_ru, preprocess
 
 logger = logging.getLogger(__name__)
 
-# Monkey-patch for pymorphy2 compatibility on Python >=3.11
-# Provide getargspec signature that matches argparse
-ArgSpec = namedtuple('ArgSpec', 'args varargs varkw defaults')
-
-
-def getargspec(func):
-    """
-    Compatibility patch for pymorphy2 on Python 3.11+, replaces inspect.getargspec.
-
-    Args:
-        func (callable): Function to analyze.
-
-    Returns:
-        ArgSpec: Named tuple with function arguments.
-    """
-    spec = inspect.getfullargspec(func)
-    return ArgSpec(args=spec.args, varargs=spec.varargs, varkw=spec.varkw, defaults=spec.defaults)
-
-
-inspect.getargspec = getargspec
-
-import re
 import os
-import nltk
+import multiprocessing
+import shutil
+import numpy as np
+import threading
+import time
 import json
-from pymorphy2 import MorphAnalyzer
-from nltk.tokenize import sent_tokenize
-from nltk.corpus import stopwords
 from gensim.models import FastText
-from nltk.data import find
+from psutil import cpu_count
 
 model_dir = os.getenv("FASTTEXT_MODEL_DIR",
                       os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "fasttext")))
 model_path = os.path.join(model_dir, "fasttext.model")
+releases_dir = os.path.join(model_dir, "releases")
+SYNONYMS_TOPN = 2
+SYNONYMS_BLOCK_BYTES = int(os.getenv("SYNONYMS_BLOCK_BYTES", 64 * 1024 * 1024))
+PREPROCESS_WORKERS = int(os.getenv("PREPROCESS_WORKERS", 0)) or cpu_count(logical=False) or 1
+PREPROCESS_CHUNKSIZE = int(os.getenv("PREPROCESS_CHUNKSIZE", 256))
+FASTTEXT_WORKERS = int(os.getenv("FASTTEXT_WORKERS", 0)) or cpu_count(logical=True) or 4
 
-def lemmatize_ru(text):
-    """
-    Lemmatizes Russian text and returns a list of normalized words.
+LoadedSynonymModel = namedtuple('LoadedSynonymModel', 'model table')
 
-    Args:
-        text (str): Input text.
 
-    Returns:
-        list[str]: List of lemmas (normalized word forms).
+class SynonymTable:
     """
-    morph = MorphAnalyzer()
-    words = re.findall(r'\b\w+\b', text.lower())
-    lemmas = [morph.parse(word)[0].normal_form for word in words]
-    return lemmas
+    Precomputed top-k nearest vocabulary words for every word of a FastText vocabulary.
 
-
-def preprocess(sentence):
+    The table is stored next to the model release as two arrays,
+    ``synonym_ids.npy`` (vocabulary indices) and ``synonym_scores.npy``
+    (cosine similarities), both of shape (vocabulary size, k).
     """
-    Preprocesses a sentence: lemmatization, stop-word and non-alphabetic token filtering.
-
-    Args:
-        sentence (str): Input sentence.
 
-    Returns:
-        list[str]: List of cleaned and lemmatized words.
+    def __init__(self, index_to_key, key_to_index, ids, scores):
+        self.index_to_key = index_to_key
+        self.key_to_index = key_to_index
+        self.ids = ids
+        self.scores = scores
+
+    @classmethod
+    def build(cls, model, topn=SYNONYMS_TOPN, block_bytes=SYNONYMS_BLOCK_BYTES):
+        """
+        Computes the table with blocked matrix products over the normalized vocabulary vectors.
+
+        Args:
+            model (FastText): Trained model.
+            topn (int): Number of synonyms per word.
+            block_bytes (int): Memory budget of one block: its similarity rows
+                plus the index array ``np.argpartition`` returns for them.
+
+        Returns:
+            SynonymTable: Table for the model vocabulary.
+        """
+        vectors = model.wv.get_normed_vectors()
+        size = len(vectors)
+        topn = max(min(topn, size - 1), 0)
+        # float32 similarities and int64 argpartition indices per compared pair
+        block_size = max(1, block_bytes // (12 * max(size, 1)))
+        ids = np.zeros((size, topn), dtype=np.int32)
+        scores = np.zeros((size, topn), dtype=np.float32)
+        for start in range(0, size if topn else 0, block_size):
+            # Negated in place: the smallest values are the nearest words
+            sims = vectors[start:start + block_size] @ vectors.T
+            np.negative(sims, out=sims)
+            rows = np.arange(len(sims))
+            sims[rows, rows + start] = np.inf  # a word is not its own synonym
+            # Copied so the full index array is freed right away, not kept alive by a view
+            top = np.argpartition(sims, topn - 1, axis=1)[:, :topn].copy()
+            top_sims = np.take_along_axis(sims, top, axis=1)
+            del sims
+            order = np.argsort(top_sims, axis=1)
+            ids[start:start + len(top)] = np.take_along_axis(top, order, axis=1)
+            scores[start:start + len(top)] = -np.take_along_axis(top_sims, order, axis=1)
+        return cls(model.wv.index_to_key, model.wv.key_to_index, ids, scores)
+
+    def save(self, directory):
+        """Saves the arrays into ``directory``."""
+        np.save(os.path.join(directory, "synonym_ids.npy"), self.ids)
+        np.save(os.path.join(directory, "synonym_scores.npy"), self.scores)
+
+    @classmethod
+    def load(cls, directory, model):
+        """
+        Memory-maps the table saved next to a model release.
+
+        Args:
+            directory (str): Release directory.
+            model (FastText): Model of the same release.
+
+        Returns:
+            SynonymTable | None: The table, or None for releases saved without one.
+        """
+        ids_path = os.path.join(directory, "synonym_ids.npy")
+        if not os.path.exists(ids_path):
+            return None
+        return cls(model.wv.index_to_key, model.wv.key_to_index,
+                   np.load(ids_path, mmap_mode='r'),
+                   np.load(os.path.join(directory, "synonym_scores.npy"), mmap_mode='r'))
+
+    def lookup(self, word, topn=SYNONYMS_TOPN):
+        """
+        Returns the precomputed synonyms of a vocabulary word.
+
+        Args:
+            word (str): Lemmatized word.
+            topn (int): Number of synonyms.
+
+        Returns:
+            list[tuple(str, float)] | None: Synonyms with scores, or None for out-of-vocabulary words.
+        """
+        index = self.key_to_index.get(word)
+        if index is None or topn > self.ids.shape[1]:
+            return None
+        return [(self.index_to_key[i], float(score))
+                for i, score in zip(self.ids[index][:topn], self.scores[index][:topn])]
+
+
+class SynonymModelHolder:
     """
-    current_dir = os.path.dirname(__file__)
-    nltk_dir = os.path.join(current_dir, "nltk")
-    os.makedirs(nltk_dir, exist_ok=True)
-    nltk.data.path.append(nltk_dir)
+    Keeps the trained FastText model in memory and reloads it when the model file is replaced.
 
+    Every :meth:`get` only stats the model file; the model is loaded
+    again only if the file changed, e.g. after a knowledge base renew.
+    The vectors are memory-mapped read-only, so all worker processes share
+    one page-cache copy of the model.
+    """
 
-    try:
-        find('corpora/stopwords')
-    except LookupError:
-        nltk.download('stopwords', download_dir=nltk_dir)
-    stop_words = set(stopwords.words('russian'))
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Path to the saved FastText model.
+        """
+        self.path = path
+        self._loaded = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def get(self):
+        """
+        Returns the current model and its synonym table, loading a newer version from disk if there is one.
+
+        Returns:
+            LoadedSynonymModel: Loaded model and synonym table (None if the release has none).
+
+        Raises:
+            ModelNotFoundError: If no model has been trained yet.
+        """
+        stamp = self._file_stamp()
+        if stamp is None:
+            if self._loaded is None:
+                logger.error("model does not exist")
+                raise ModelNotFoundError(
+                    "FastText model and context are missing. "
+                    "Please run initial ingestion to build the knowledge base context and train the model."
+                )
+            return self._loaded
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    # Resolve the symlink: the .npy arrays live next to the release file
+                    release_path = os.path.realpath(self.path)
+                    logger.info(f"Loading FastText model from {release_path}")
+                    model = FastText.load(release_path, mmap='r')
+                    table = SynonymTable.load(os.path.dirname(release_path), model)
+                    self._loaded, self._stamp = LoadedSynonymModel(model, table), stamp
+        return self._loaded
+
+    def reload(self):
+        """Forces the model to be read from disk on the next :meth:`get`."""
+        self._stamp = None
+
+
+synonym_model = SynonymModelHolder(model_path)
+
+def write_corpus(processed_sentences, corpus_path):
+    """
+    Streams preprocessed sentences into a corpus file, one space-separated sentence per line.
 
-    words = lemmatize_ru(sentence)
-    filtered_words = [word for word in words if word.isalpha() and word not in stop_words]
-    return filtered_words
+    The file is written next to its final location and moved into place
+    when complete. Empty sentences are skipped.
 
+    Args:
+        processed_sentences (iterable[list[str]]): Preprocessed sentences.
+        corpus_path (str): Path of the corpus file.
 
-def learning_model(processed_sentences):
+    Returns:
+        int: Number of sentences written.
+    """
+    os.makedirs(os.path.dirname(corpus_path), exist_ok=True)
+    tmp_path = corpus_path + ".tmp"
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for tokens in processed_sentences:
+            if tokens:
+                f.write(" ".join(tokens))
+                f.write("\n")
+                count += 1
+    os.replace(tmp_path, corpus_path)
+    return count
+
+
+def learning_model(processed_sentences=None, corpus_file=None, publish=True):
     """
-    Trains a FastText model on the processed sentences and saves it.
+    Trains a FastText model and publishes it with :func:`publish_model`.
+
+    With ``corpus_file`` the model is trained straight from a corpus file
+    written by :func:`write_corpus`: gensim re-reads it for every epoch with
+    all workers, so memory stays flat regardless of the corpus size.
 
     Args:
-        processed_sentences (list[list[str]]): List of sentences where each is a list of tokens.
+        processed_sentences (list[list[str]] | None): List of sentences where each is a list of tokens.
+        corpus_file (str | None): Path to a line-per-sentence corpus file, used instead of ``processed_sentences``.
+        publish (bool): If False, the caller publishes the model itself.
+
+    Returns:
+        FastText: Trained model.
     """
-    logger.info("Learning model... by sentences: " + str(len(processed_sentences)))
     os.makedirs(model_dir, exist_ok=True)
     model = FastText(
         vector_size=200,
         window=5,
         min_count=1,
-        workers=4
+        workers=FASTTEXT_WORKERS
     )
-    model.build_vocab(processed_sentences)
-    model.train(processed_sentences, total_examples=len(processed_sentences), epochs=10)
-    model.save(model_path)
+    if corpus_file is not None:
+        logger.info(f"Learning model... by corpus file: {corpus_file}")
+        model.build_vocab(corpus_file=corpus_file)
+        model.train(corpus_file=corpus_file, total_words=model.corpus_total_words, epochs=10)
+    else:
+        logger.info("Learning model... by sentences: " + str(len(processed_sentences)))
+        model.build_vocab(processed_sentences)
+        model.train(processed_sentences, total_examples=len(processed_sentences), epochs=10)
+    if publish:
+        publish_model(model)
+    return model
+
+
+def publish_model(model):
+    """
+    Saves a trained model and its precomputed synonym table as a new release
+    and atomically points ``model_path`` to it.
+
+    Every numpy array of the model is stored as a separate ``.npy`` file so
+    that all workers can memory-map the same release. ``model_path`` is a
+    symlink replaced with :func:`os.replace`; releases older than the
+    previous one are removed (workers still mapping them keep their pages).
+
+    Args:
+        model (FastText): Trained model.
+    """
+    release_dir = os.path.join(releases_dir, str(time.time_ns()))
+    os.makedirs(release_dir)
+    release_path = os.path.join(release_dir, "fasttext.model")
+    model.save(release_path, sep_limit=0)
+    SynonymTable.build(model).save(release_dir)
+
+    tmp_link = model_path + ".tmp"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.relpath(release_path, model_dir), tmp_link)
+    os.replace(tmp_link, model_path)
+    logger.info(f"Published FastText model release {release_dir}")
+
+    for old_release in sorted(os.listdir(releases_dir))[:-2]:
+        shutil.rmtree(os.path.join(releases_dir, old_release), ignore_errors=True)
 
 
 def learning_synonims(file_path):
@@ -116,21 +290,61 @@ def learning_synonims(file_path):
     Returns:
         list[list[str]]: List of preprocessed sentences with tokens.
     """
-    with open(file_path, "r", encoding="utf-8") as f:
-        text = f.read()
-    sentences = sent_tokenize(text, language='russian')
-    processed_sentences = [preprocess(sentence) for sentence in sentences]
-    return processed_sentences
+    return list(preprocess_sentences(iter_file_sentences([file_path])))
 
 
+def iter_file_sentences(file_paths):
+    """
+    Yields the sentences of the given text files one file after another.
 
-def synonimize_question(question, model):
+    Args:
+        file_paths (iterable[str | ZipMember]): Paths to the text files or ZIP archive members.
+
+    Yields:
+        str: Next sentence.
+    """
+    for file_path in file_paths:
+        logger.info(f"Reading sentences from {file_path}")
+        yield from split_sentences(read_document(file_path))
+
+
+def preprocess_sentences(sentences, workers=PREPROCESS_WORKERS, chunksize=PREPROCESS_CHUNKSIZE):
+    """
+    Preprocesses sentences on a process pool, preserving their order.
+
+    Sentences are sent to the workers in chunks with ``Pool.imap`` and the
+    results are yielded as soon as they are ready, so callers can stream
+    them into the training corpus.
+
+    Args:
+        sentences (iterable[str]): Sentences to preprocess.
+        workers (int): Number of worker processes; 1 preprocesses in the current process.
+        chunksize (int): Number of sentences sent to a worker at once.
+
+    Yields:
+        list[str]: Preprocessed sentence tokens.
+    """
+    if workers <= 1:
+        yield from map(preprocess, sentences)
+        return
+    # spawn: forking a process that already runs torch and event loop threads is unsafe.
+    # preprocess lives in the lightweight lemmatizer module, so the workers import neither torch nor gensim
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        yield from pool.imap(preprocess, sentences, chunksize=chunksize)
+
+
+
+def synonimize_question(question, model, table=None):
     """
     Retrieves synonyms for each word in the question using a trained FastText model.
 
+    Vocabulary words are looked up in the precomputed synonym table; the
+    model is only searched for words the table does not cover.
+
     Args:
         question (str): Input question.
         model (FastText): Trained FastText model.
+        table (SynonymTable | None): Precomputed synonyms of the model vocabulary.
 
     Returns:
         list[tuple(str, list)]: List of tuples (word, list of similar words with scores).
@@ -138,7 +352,10 @@ def synonimize_question(question, model):
     question_tokens = preprocess(question)
     synonymized_question = []
     for word in question_tokens:
-        if word in model.wv:
+        synonyms = table.lookup(word, topn=2) if table is not None else None
+        if synonyms is not None:
+            synonymized_question.append((word, synonyms))
+        elif word in model.wv:
             synonyms = model.wv.most_similar(word, topn=2)
             synonymized_question.append((word, synonyms))
         else:
@@ -148,7 +365,7 @@ def synonimize_question(question, model):
 
 def result_question(question):
     """
-    Constructs an expanded question with synonyms, training the model if needed.
+    Constructs an expanded question with synonyms using the in-memory FastText model.
 
     Args:
         question (str): Input question.
@@ -157,20 +374,12 @@ def result_question(question):
         str: String with the original question and added synonyms.
 
     Raises:
-        RuntimeError: If the model and context are missing.
+        ModelNotFoundError: If the model has not been trained yet.
     """
     questions = []
-    logger.info(f"Searching model at path: {abspath(model_path)}")
-    if not os.path.exists(model_path):
-        logger.error("model does not exist")
-        raise ModelNotFoundError(
-            "FastText model and context are missing. "
-            "Please run initial ingestion to build the knowledge base context and train the model."
-        )
-
-    model = FastText.load(model_path)
+    loaded = synonym_model.get()
 
-    synonyms = synonimize_question(question, model)
+    synonyms = synonimize_question(question, loaded.model, loaded.table)
     synonymized_question = []
     for word, word_synonyms in synonyms:
         synonymized_question.append(word)
@@ -206,11 +415,7 @@ def context(base_directory):
     else:
         logger.info("Searching context files in the directory: knowledge_base")
         context_files = knowledge_base_runner("knowledge_base")
-        full_context = []
-        for file, directory in context_files.items():
-            print("Идет запись из файла: ", file)
-            context = learning_synonims(directory)
-            full_context += context
+        full_context = list(preprocess_sentences(iter_file_sentences(context_files.values())))
         with open(context_file, 'w', encoding='utf-8') as f:
             json.dump(full_context, f, ensure_ascii=False, indent=2)
 
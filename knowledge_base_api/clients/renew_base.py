@@ -1,79 +1,234 @@
 import asyncio
 import os
-import json
-from functools import partial
-from knowledge_base_api.clients.chunking import knowledge_base_runner, chunking
-from knowledge_base_api.clients.qdrant_sender import async_send
-from knowledge_base_api.clients.question_synonimizer import learning_synonims, learning_model, model_path
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from knowledge_base_api.clients import collection_registry
+from knowledge_base_api.clients.chunking import (
+    knowledge_base_runner, zip_knowledge_base, read_document, split_document, build_points,
+)
+from knowledge_base_api.clients.embedding_cache import CONTEXT_DIR
+from knowledge_base_api.clients.kb_manifest import file_fingerprint, load_manifest, save_manifest
+from knowledge_base_api.clients.qdrant_sender import (
+    KB_INDEX_LAYOUT, async_send, async_send_delta, async_list_collections,
+    async_replace_document, async_delete_document, ensure_unified_collection, target_collection,
+)
+from knowledge_base_api.clients.question_synonimizer import (
+    iter_file_sentences, preprocess_sentences, write_corpus, learning_model, publish_model, synonym_model,
+)
 
 import logging
 logger = logging.getLogger(__name__)
 
-async def main(kb_dir=None):
+CORPUS_PATH = os.path.join(CONTEXT_DIR, "corpus.txt")
+
+def _no_progress(branch, phase, done=None, total=None):
+    pass
+
+
+class RenewCancelled(Exception):
+    """Raised by the synonym branch when it stops because the vector branch failed."""
+
+
+def _check_stop(stop):
+    if stop is not None and stop.is_set():
+        raise RenewCancelled("Renew cancelled")
+
+
+def _until_stopped(items, stop):
+    for item in items:
+        _check_stop(stop)
+        yield item
+
+
+async def main(kb_dir=None, delta=True, progress=_no_progress):
     """
     Main async entry point for processing the knowledge base:
 
     - Determines the knowledge‑base directory if not provided.
-    - Scans and loads all knowledge‑base files.
-    - Splits each file into chunks and uploads the data to Qdrant.
-    - Refreshes the context by calling :func:`context` in a separate executor.
+    - Scans the knowledge‑base files once.
+    - Runs two branches concurrently: :func:`update_vectors` (chunk, embed
+      and upload to Qdrant) and :func:`update_synonyms` (build the corpus
+      once and retrain the FastText model).
 
     Args:
-        kb_dir (str | None): Path to the knowledge‑base directory.
+        kb_dir (str | None): Path to the knowledge‑base directory or ZIP archive;
+            archive members are read in place, without extraction.
             If *None*, the default ``knowledge_base`` directory is used.
+        delta (bool): If False, every collection is dropped and rebuilt.
+        progress (callable): Called as ``progress(branch, phase, done, total)``
+            whenever a branch advances; may be called from a worker thread.
+
+    Returns:
+        dict: Number of "added", "removed" and "unchanged" chunks.
     """
     if kb_dir is None:
         kb_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "knowledge_base"))
-    logger.info(f"Process kb_dir: {kb_dir}")
-    files = knowledge_base_runner(kb_dir)
-    for name, path in files.items():
-        print(f"Загрузка в Qdrant «{name}» ")
-        filechunks = chunking(path, name)
-        await async_send(filechunks, name, rewrite=True)
+    logger.info(f"Process kb_dir: {kb_dir}, delta: {delta}")
+    if kb_dir.endswith(".zip") and os.path.isfile(kb_dir):
+        files = zip_knowledge_base(kb_dir)
+    else:
+        files = knowledge_base_runner(kb_dir)
+    # The synonym branch runs on its own thread, which cannot be interrupted:
+    # if either branch fails, the other one is stopped and the renew only
+    # returns once both have finished, so nothing keeps writing after the
+    # job has ended and released the renew lock.
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="renew-synonyms") as synonyms_executor:
+        synonyms = asyncio.wrap_future(synonyms_executor.submit(update_synonyms, files, progress, stop))
+        vectors = asyncio.ensure_future(update_vectors(files, delta, progress))
+        try:
+            stats, _ = await asyncio.gather(vectors, synonyms)
+        except BaseException:
+            stop.set()
+            vectors.cancel()
+            await asyncio.gather(vectors, return_exceptions=True)
+            # Waits for the synonym thread to reach its next stop check
+            await asyncio.to_thread(synonyms_executor.shutdown, wait=True)
+            raise
+    return stats
+
+
+def _split_file(path, name):
+    return split_document(read_document(path), name)
+
+
+async def update_vectors(files, delta=True, progress=_no_progress):
+    """
+    Splits each file into chunks and uploads the data to Qdrant.
 
-    loop = asyncio.get_event_loop()
+    In delta mode every file is compared with the manifest of what is
+    currently indexed: unchanged files are skipped, changed files only get
+    their new chunks upserted and their vanished chunks deleted. Files
+    without a manifest entry (or whose collection is missing) are loaded
+    from scratch. Documents that are in the manifest but no longer among
+    ``files`` are deleted from Qdrant.
 
-    await loop.run_in_executor(None, partial(context, kb_dir))
+    With ``KB_INDEX_LAYOUT=unified`` all documents share one collection and
+    a full reload of a document replaces its points in place instead of
+    rebuilding a collection.
 
-    context(kb_dir)
+    Chunking and embedding run on a worker thread to keep the event loop free.
 
-    full_ctx = context(kb_dir)
-    if not full_ctx:
+    Args:
+        files (dict): Document name -> file path or archive member, as returned by
+            :func:`knowledge_base_runner` or :func:`zip_knowledge_base`.
+        delta (bool): If False, every collection is dropped and rebuilt.
+        progress (callable): Progress callback, see :func:`main`.
+
+    Returns:
+        dict: Number of "added", "removed" and "unchanged" chunks.
+    """
+    manifest = load_manifest()
+    if KB_INDEX_LAYOUT == "unified":
+        await ensure_unified_collection()
+    existing_collections = await async_list_collections()
+    stats = {"added": 0, "removed": 0, "unchanged": 0}
+    for done, (name, path) in enumerate(files.items()):
+        progress("vectors", "indexing", done, len(files))
+        print(f"Загрузка в Qdrant «{name}» ")
+        fingerprint = file_fingerprint(path)
+        collection_name = target_collection(name)
+        indexed = manifest.get(name)
+        if indexed and (indexed.get("collection", name) != collection_name
+                        or collection_name not in existing_collections):
+            indexed = None
+
+        if delta and indexed and indexed["fingerprint"] == fingerprint:
+            logger.info(f"{name}: unchanged, skipping")
+            stats["unchanged"] += len(indexed["point_ids"])
+            continue
+
+        chunks = await asyncio.to_thread(_split_file, path, name)
+        point_ids = [chunk.id for chunk in chunks]
+
+        if delta and indexed:
+            old_ids = set(indexed["point_ids"])
+            new_ids = set(point_ids)
+            new_chunks = [chunk for chunk in chunks if chunk.id not in old_ids]
+            removed_ids = [point_id for point_id in indexed["point_ids"] if point_id not in new_ids]
+            points = await asyncio.to_thread(build_points, new_chunks, name)
+            await async_send_delta(points, removed_ids, collection_name)
+            file_stats = {"added": len(new_chunks), "removed": len(removed_ids),
+                          "unchanged": len(chunks) - len(new_chunks)}
+        elif KB_INDEX_LAYOUT == "unified":
+            points = await asyncio.to_thread(build_points, chunks, name)
+            await async_replace_document(points, name, collection_name)
+            file_stats = {"added": len(chunks), "removed": len(indexed["point_ids"]) if indexed else 0,
+                          "unchanged": 0}
+        else:
+            points = await asyncio.to_thread(build_points, chunks, name)
+            if not await async_send(points, name, rewrite=True):
+                raise RuntimeError(f"Failed to load «{name}» into Qdrant")
+            file_stats = {"added": len(chunks), "removed": len(indexed["point_ids"]) if indexed else 0,
+                          "unchanged": 0}
+
+        logger.info(f"{name}: {file_stats}")
+        for key, value in file_stats.items():
+            stats[key] += value
+        manifest[name] = {"fingerprint": fingerprint, "point_ids": point_ids, "collection": collection_name}
+        save_manifest(manifest)
+        collection_registry.invalidate()
+
+    for name in [name for name in manifest if name not in files]:
+        indexed = manifest[name]
+        print(f"Удаление из Qdrant «{name}» ")
+        await async_delete_document(name, indexed.get("collection", name))
+        logger.info(f"{name}: no longer in the knowledge base, removed")
+        stats["removed"] += len(indexed["point_ids"])
+        del manifest[name]
+        save_manifest(manifest)
+        collection_registry.invalidate()
+
+    progress("vectors", "done", len(files), len(files))
+    return stats
+
+
+def update_synonyms(files, progress=_no_progress, stop=None):
+    """
+    Builds the training corpus once and retrains the FastText synonym model.
+
+    Args:
+        files (dict): Document name -> file path or archive member, as returned by
+            :func:`knowledge_base_runner` or :func:`zip_knowledge_base`.
+        progress (callable): Progress callback, see :func:`main`.
+        stop (threading.Event | None): When set, the branch stops at the next
+            sentence or phase boundary; a trained model is then not published.
+
+    Raises:
+        RuntimeError: If the files contain no usable sentences.
+        RenewCancelled: If ``stop`` was set.
+    """
+    progress("synonyms", "preprocessing")
+    if not context(files, stop):
         raise RuntimeError(
             "FastText model and context are missing. "
             "Please run initial ingestion to build the knowledge base context and train the model."
         )
 
-    if os.path.exists(model_path):
-        logger.info(f"Model already exists at {model_path}. Removing and retraining...")
-        os.remove(model_path)
-
-    learning_model(full_ctx)
+    _check_stop(stop)
+    progress("synonyms", "training")
+    model = learning_model(corpus_file=CORPUS_PATH, publish=False)
+    _check_stop(stop)
+    publish_model(model)
+    synonym_model.reload()
+    progress("synonyms", "done")
 
-def context(kb_dir):
+def context(files, stop=None):
     """
-    Collects context from knowledge‑base files and stores it as JSON.
+    Collects context from knowledge‑base files into the line-per-sentence corpus file.
+
+    Preprocessed sentences are streamed from the preprocessing pool straight
+    into :data:`CORPUS_PATH`, the corpus is never held in memory.
 
     Args:
-        kb_dir (str): Path to the knowledge‑base directory.
+        files (dict): Document name -> file path or archive member.
+        stop (threading.Event | None): Aborts the corpus when set, see :func:`update_synonyms`.
+
+    Returns:
+        int: Number of sentences in the corpus.
     """
-    context_dir = os.path.join(os.path.dirname(__file__),
-                               "..", "..", "context")
-    context_dir = os.path.abspath(context_dir)
-    os.makedirs(context_dir, exist_ok=True)
-
-    context_file = os.path.join(context_dir, "context.json")
-
-    context_files = knowledge_base_runner(kb_dir)
-
-    full_context = []
-    for file, directory in context_files.items():
-        print("Модель. Идет запись из файла: ", file)
-        context = learning_synonims(directory)
-        full_context += context
-    with open(context_file, 'w', encoding='utf-8') as f:
-        json.dump(full_context, f, ensure_ascii=False, indent=2)
-    return full_context
+    sentences = preprocess_sentences(iter_file_sentences(files.values()))
+    return write_corpus(_until_stopped(sentences, stop), CORPUS_PATH)
 
 if __name__ == "__main__":
     asyncio.run(main())
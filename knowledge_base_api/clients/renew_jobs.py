@@ -0,0 +1,248 @@
+import asyncio
+import fcntl
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from knowledge_base_api.clients import collection_registry
+from knowledge_base_api.clients.embedding_cache import CONTEXT_DIR
+from knowledge_base_api.clients.kb_manifest import bump_kb_version
+from knowledge_base_api.clients.question_synonimizer import synonym_model
+
+logger = logging.getLogger(__name__)
+
+JOBS_DIR = os.path.join(CONTEXT_DIR, "jobs")
+RENEW_LOCK_PATH = os.path.join(CONTEXT_DIR, "renew.lock")
+
+_executor = None
+
+
+def _job_path(job_id):
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+
+def _write_status(status):
+    """Atomically writes a job status file, so every API worker can read it."""
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    path = _job_path(status["job_id"])
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(status, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def get_job_status(job_id):
+    """
+    Reads the status of a renew job.
+
+    Args:
+        job_id (str): Job identifier returned by :func:`submit_renew_job`.
+
+    Returns:
+        dict | None: Job status, or None if the job is unknown.
+    """
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        return None
+    try:
+        with open(_job_path(job_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class JobReporter:
+    """
+    Progress callback for :func:`knowledge_base_api.clients.renew_base.main`
+    that records the phase, progress and timings of every branch in the job status file.
+    """
+
+    def __init__(self, status):
+        self.status = status
+        self._started = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, branch, phase, done=None, total=None):
+        with self._lock:
+            now = time.time()
+            self._started.setdefault(branch, now)
+            self.status["phase"] = f"{branch}: {phase}"
+            if done is not None:
+                self.status["progress"][branch] = {"done": done, "total": total}
+            if phase == "done":
+                self.status["timings"][branch] = round(now - self._started[branch], 3)
+            _write_status(self.status)
+
+
+def _cleanup(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+@contextmanager
+def _renew_lock(status):
+    """
+    Holds an exclusive lock for the whole renew.
+
+    Every API worker process has its own renew worker, and concurrent renews
+    would share the manifest, the corpus file, the FastText releases and the
+    shadow collection versions. The job stays "queued" until the lock is acquired.
+    """
+    os.makedirs(CONTEXT_DIR, exist_ok=True)
+    with open(RENEW_LOCK_PATH, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            status["phase"] = "waiting for another renew"
+            _write_status(status)
+            logger.info(f"Renew job {status['job_id']} is waiting for another renew to finish")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def run_renew_job(job_id, kb_dir, delta, cleanup_path=None):
+    """
+    Runs a knowledge base renew in the current (worker) process and records its outcome.
+
+    Args:
+        job_id (str): Job identifier.
+        kb_dir (str): Directory or ZIP archive with the knowledge base files.
+        delta (bool): Delta or full renew, see :func:`renew_base.main`.
+        cleanup_path (str | None): File or directory removed once the job has finished.
+
+    Returns:
+        dict: Final job status.
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    # Imported here: the pipeline (embedding model, gensim) is only needed in the worker
+    from knowledge_base_api.clients.qdrant_pool import close_client
+    from knowledge_base_api.clients.renew_base import main as renew_knowledge_base
+
+    status = get_job_status(job_id)
+    try:
+        with _renew_lock(status):
+            status.update(status="running", phase="starting", started_at=time.time())
+            _write_status(status)
+            reporter = JobReporter(status)
+
+            async def _run():
+                try:
+                    return await renew_knowledge_base(kb_dir, delta=delta, progress=reporter)
+                finally:
+                    await close_client()
+
+            try:
+                result = asyncio.run(_run())
+                # Lets answer caches drop everything computed against the old knowledge base
+                result["kb_version"] = bump_kb_version()
+                status.update(status="succeeded", phase="done", result=result)
+            except Exception as e:
+                logger.exception(f"Renew job {job_id} failed")
+                status.update(status="failed", error=str(e))
+    finally:
+        if cleanup_path is not None:
+            _cleanup(cleanup_path)
+
+    status["finished_at"] = time.time()
+    status["timings"]["total"] = round(status["finished_at"] - status["started_at"], 3)
+    _write_status(status)
+    return status
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # One dedicated worker: renews run one after another, never on the API process
+        _executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def _reset_executor(executor):
+    """Drops a broken pool so that the next job starts a fresh worker process."""
+    global _executor
+    if _executor is executor:
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _on_job_finished(job_id, executor, future):
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        # The worker process itself died (e.g. OOM-killed); record it, run_renew_job could not
+        logger.error(f"Renew job {job_id} crashed: {error}")
+        if isinstance(error, BrokenProcessPool):
+            _reset_executor(executor)
+        status = get_job_status(job_id) or {"job_id": job_id, "timings": {}, "progress": {}}
+        status.update(status="failed", error=str(error), finished_at=time.time())
+        _write_status(status)
+    collection_registry.invalidate()
+    synonym_model.reload()
+
+
+def submit_renew_job(kb_dir, delta=True, cleanup_path=None):
+    """
+    Queues a knowledge base renew on the dedicated renew worker process.
+
+    Args:
+        kb_dir (str): Directory or ZIP archive with the knowledge base files.
+        delta (bool): Delta or full renew, see :func:`renew_base.main`.
+        cleanup_path (str | None): File or directory removed once the job has finished.
+
+    Returns:
+        str: Job identifier for :func:`get_job_status`.
+    """
+    job_id = str(uuid.uuid4())
+    _write_status({
+        "job_id": job_id,
+        "status": "queued",
+        "phase": "queued",
+        "delta": delta,
+        "progress": {},
+        "timings": {},
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "result": None,
+        "error": None,
+    })
+    executor = _get_executor()
+    try:
+        future = executor.submit(run_renew_job, job_id, kb_dir, delta, cleanup_path)
+    except BrokenProcessPool:
+        logger.warning("Renew worker pool is broken, starting a new one")
+        _reset_executor(executor)
+        executor = _get_executor()
+        future = executor.submit(run_renew_job, job_id, kb_dir, delta, cleanup_path)
+    future.add_done_callback(lambda f: _on_job_finished(job_id, executor, f))
+    logger.info(f"Renew job {job_id} queued for {kb_dir}")
+    return job_id
+
+
+def shutdown():
+    """Stops the renew worker process, cancelling queued jobs."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -1,8 +1,14 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from knowledge_base_api.api.router.knowledge_base_router import knowledge_base_router
-import logging
+from knowledge_base_api.clients import collection_registry, renew_jobs
+from knowledge_base_api.clients.ModelNotFoundError import ModelNotFoundError
+from knowledge_base_api.clients.question_processor import query_batcher
+from knowledge_base_api.clients.question_synonimizer import synonym_model
+from knowledge_base_api.clients.qdrant_pool import get_client, health_check_loop, close_client
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +19,35 @@ def configure_logging() -> None:
         format="%(asctime)s %(levelname)s %(name)s: %(message)s",
     )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Opens the shared Qdrant client, loads the collection registry and the
+    synonym model on startup; closes the client and stops the renew worker on shutdown.
+
+    Args:
+        app (FastAPI): The FastAPI app instance.
+
+    Yields:
+        None
+    """
+    await get_client()
+    try:
+        await collection_registry.refresh()
+    except Exception as e:
+        logger.warning(f"Collection registry not loaded at startup: {e}")
+    try:
+        await asyncio.to_thread(synonym_model.get)
+    except ModelNotFoundError:
+        logger.warning("FastText model is not trained yet")
+    health_task = asyncio.create_task(health_check_loop())
+    try:
+        yield
+    finally:
+        health_task.cancel()
+        renew_jobs.shutdown()
+        await query_batcher.close()
+        await close_client()
+
 def create_app() -> FastAPI:
     """Factory to create and configure the FastAPI app."""
     configure_logging()
@@ -20,7 +55,8 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="Knowledge Base API",
         description="API for managing knowledge bases",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan,
     )
 
     @app.get("/health")
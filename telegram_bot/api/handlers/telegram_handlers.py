@@ -13,6 +13,8 @@ from __future__ import annotations
 import os
 import sys
 import re
+import time
+import asyncio
 import logging
 
 sys.path.insert(0, os.path.abspath(os.getcwd()))
@@ -22,6 +24,8 @@ from sqlalchemy import select  # noqa: E402
 from telegram import (  # noqa: E402
     Update, BotCommand, InlineKeyboardButton, InlineKeyboardMarkup,
 )
+from telegram.constants import ChatAction, MessageLimit  # noqa: E402
+from telegram.error import BadRequest, RetryAfter  # noqa: E402
 from telegram.helpers import escape_markdown  # noqa: E402
 from telegram.ext import (  # noqa: E402
     Application, CallbackQueryHandler, CommandHandler,
@@ -140,6 +144,9 @@ async def ask_receive_question(update: Update, ctx: ContextTypes.DEFAULT_TYPE) -
     Handles the user's question input, queries the assistant API, logs the interaction,
     and shows the feedback prompt.
 
+    With ``settings.telegram.stream_answers`` the answer is streamed into a
+    placeholder message instead of being sent once it is complete.
+
     Args:
         update (Update): Telegram update containing the user's question.
         ctx (ContextTypes.DEFAULT_TYPE): Context with user and session data.
@@ -150,19 +157,24 @@ async def ask_receive_question(update: Update, ctx: ContextTypes.DEFAULT_TYPE) -
     question = clean(update.message.text)
     user = update.effective_user
 
-    try:
-        assistant_response = await ask_assistant_via_api(question)
-    except Exception as e:
-        logger.exception("Assistant API error: %s", e)
-        await update.message.reply_text("⚠️ Ошибка при получении ответа. Попробуйте позже.")
-        return ConversationHandler.END
+    if settings.telegram.stream_answers:
+        answer_text = await stream_answer(update, ctx, question)
+        if answer_text is None:
+            return ConversationHandler.END
+    else:
+        try:
+            assistant_response = await ask_assistant_via_api(question)
+        except Exception as e:
+            logger.exception("Assistant API error: %s", e)
+            await update.message.reply_text("⚠️ Ошибка при получении ответа. Попробуйте позже.")
+            return ConversationHandler.END
 
-    if not assistant_response or not assistant_response.get("answer"):
-        await update.message.reply_text("⚠️ Ассистент не смог дать ответ.")
-        return ConversationHandler.END
+        if not assistant_response or not assistant_response.get("answer"):
+            await update.message.reply_text("⚠️ Ассистент не смог дать ответ.")
+            return ConversationHandler.END
 
-    answer_text = assistant_response["answer"]
-    await update.message.reply_text(md(answer_text), parse_mode="MarkdownV2")
+        answer_text = assistant_response["answer"]
+        await update.message.reply_text(md(answer_text), parse_mode="MarkdownV2")
 
     async with AsyncSessionLocal() as session:
         sess = await LogRepository.add_log_async(
@@ -186,6 +198,146 @@ async def ask_receive_question(update: Update, ctx: ContextTypes.DEFAULT_TYPE) -
     await update.message.reply_text("Оцените ответ:", reply_markup=InlineKeyboardMarkup(kb))
     return ConversationHandler.END
 
+# ───── Streamed answers ───────────────────────────────────────────────────
+def split_answer(text: str, limit: int = MessageLimit.MAX_TEXT_LENGTH) -> list[str]:
+    """
+    Splits an answer into parts that fit into one Telegram message each once escaped.
+
+    Parts end at line breaks where possible; longer lines are cut. Escaping
+    at most doubles the length, so a cut part always fits.
+
+    Args:
+        text (str): Unescaped answer text.
+        limit (int): Maximum length of an escaped part.
+
+    Returns:
+        list[str]: Unescaped parts, at least one.
+    """
+    parts, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(md(line)) > limit:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(line[:limit // 2])
+            line = line[limit // 2:]
+        if len(md(current + line)) > limit:
+            parts.append(current)
+            current = ""
+        current += line
+    if current or not parts:
+        parts.append(current)
+    return parts
+
+async def _send_with_retry(send, retry: bool):
+    """
+    Runs a Telegram call, waiting out one RetryAfter if ``retry`` is set.
+
+    "Message is not modified" errors are ignored: the message already shows the text.
+
+    Args:
+        send: Zero-argument function returning the coroutine to run.
+        retry (bool): Whether to retry once after a RetryAfter instead of raising it.
+    """
+    for attempt in range(2):
+        try:
+            await send()
+            return
+        except RetryAfter as e:
+            if not retry or attempt:
+                raise
+            await asyncio.sleep(e.retry_after)
+        except BadRequest as e:
+            # Same text as already shown, e.g. the last delta was whitespace
+            if "not modified" not in str(e).lower():
+                raise
+            return
+
+async def edit_answer(message, text: str) -> bool:
+    """
+    Replaces the text of a bot message with the escaped answer so far.
+
+    Only the part that fits into one message is shown. The edit is skipped
+    when Telegram asks to slow down; a later edit catches up.
+
+    Args:
+        message: Bot message to edit.
+        text (str): Full answer text accumulated so far (unescaped).
+
+    Returns:
+        bool: True if the message now shows the text.
+    """
+    first_part = split_answer(text)[0]
+    try:
+        await _send_with_retry(lambda: message.edit_text(md(first_part), parse_mode="MarkdownV2"), retry=False)
+    except RetryAfter:
+        return False
+    return True
+
+async def deliver_answer(update: Update, placeholder, text: str) -> None:
+    """
+    Shows the complete answer: the placeholder gets the first part, further
+    parts are sent as replies. Each call waits out one RetryAfter.
+
+    Args:
+        update (Update): Telegram update containing the user's question.
+        placeholder: Bot message with the streamed answer.
+        text (str): Complete answer text (unescaped).
+    """
+    first_part, *other_parts = split_answer(text)
+    await _send_with_retry(lambda: placeholder.edit_text(md(first_part), parse_mode="MarkdownV2"), retry=True)
+    for part in other_parts:
+        await _send_with_retry(lambda: update.message.reply_text(md(part), parse_mode="MarkdownV2"), retry=True)
+
+async def stream_answer(update: Update, ctx: ContextTypes.DEFAULT_TYPE, question: str) -> str | None:
+    """
+    Posts a placeholder right away and edits it as the answer is streamed
+    from the assistant API, at most once per ``settings.telegram.stream_edit_interval``.
+
+    Args:
+        update (Update): Telegram update containing the user's question.
+        ctx (ContextTypes.DEFAULT_TYPE): Context with user and session data.
+        question (str): Cleaned question text.
+
+    Returns:
+        str | None: The full answer, or None if there is none (the user has been told).
+    """
+    await ctx.bot.send_chat_action(update.effective_chat.id, ChatAction.TYPING)
+    placeholder = await update.message.reply_text("⏳ Ищу ответ…")
+
+    answer_text = ""
+    last_edit = time.monotonic()
+    try:
+        async for event in tokeon_assistant_client.ask_question_stream(question):
+            if "delta" in event or "replace" in event:
+                if "replace" in event:
+                    answer_text = event["replace"]
+                else:
+                    answer_text += event["delta"]
+                if time.monotonic() - last_edit >= settings.telegram.stream_edit_interval:
+                    last_edit = time.monotonic()
+                    await edit_answer(placeholder, answer_text)
+            elif "error" in event:
+                raise RuntimeError(event["error"])
+            elif event.get("done"):
+                answer_text = event.get("answer") or answer_text
+    except Exception as e:
+        logger.exception("Assistant API error: %s", e)
+        await placeholder.edit_text("⚠️ Ошибка при получении ответа. Попробуйте позже.")
+        return None
+
+    if not answer_text:
+        await placeholder.edit_text("⚠️ Ассистент не смог дать ответ.")
+        return None
+
+    try:
+        await deliver_answer(update, placeholder, answer_text)
+    except Exception as e:
+        logger.exception("Failed to send the answer: %s", e)
+        await update.message.reply_text("⚠️ Ошибка при отправке ответа. Попробуйте позже.")
+        return None
+    return answer_text
+
 # ───── ORIGINAL API IMPLEMENTATION (DO NOT DELETE) ────────────────────────
 async def ask_assistant_via_api(question: str) -> dict | None:
     base_url = os.getenv("TOKEON_ASSISTANT_REST_API_URL",
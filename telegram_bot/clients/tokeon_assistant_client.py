@@ -2,7 +2,8 @@
 
 import logging
 import os
-from typing import Dict, Optional, Any, Union
+import json
+from typing import AsyncIterator, Dict, Optional, Any, Union
 
 import httpx
 
@@ -75,6 +76,50 @@ class TokeonAssistantClient:
             logger.error(f"Error calling assistant API: {e}")
             raise
             
+    async def ask_question_stream(self, question: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Send a question to the streaming assistant API and yield answer events as they arrive.
+
+        Events are, in order: ``{"answer_id"}``, any number of ``{"delta"}``
+        with the next part of the answer or ``{"replace"}`` with the whole text
+        that replaces everything received so far, then ``{"done": True, "answer"}``
+        or ``{"error"}``.
+
+        Args:
+            question: The question to ask
+
+        Yields:
+            Dict with one answer event
+
+        Raises:
+            httpx.HTTPStatusError: If the API returns a 4xx/5xx status code
+            Exception: For other errors
+        """
+        url = f"{self.base_url}/answers/stream"
+        data = {"query": question}
+        logger.info(f"Streaming question from assistant API: {url} with data: {data}")
+
+        try:
+            async with httpx.AsyncClient() as client:
+                async with client.stream(
+                    "POST",
+                    url,
+                    json=data,
+                    timeout=httpx.Timeout(self.timeout, connect=10)
+                ) as response:
+                    if response.is_error:
+                        await response.aread()
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if line.strip():
+                            yield json.loads(line)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error from assistant API: {e.response.status_code} - {e.response.text}")
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming from assistant API: {e}")
+            raise
+
     async def send_feedback(self, answer_id: str, reaction: str, comment: Optional[str] = None) -> bool:
         """
         Send feedback about an answer to the assistant API.
@@ -7,9 +7,13 @@ class TelegramConfig(BaseModel):
         Attributes:
             token: Telegram bot token.
             webhook_path: Webhook URL path for receiving updates.
+            stream_answers: Show the answer while it is generated by editing a placeholder message.
+            stream_edit_interval: Minimum delay between edits of a streamed answer, in seconds.
         """
     token: str
     webhook_path: str
+    stream_answers: bool = True
+    stream_edit_interval: float = 1.5
 
 class LoggingConfig(BaseModel):
     """Logging configuration.
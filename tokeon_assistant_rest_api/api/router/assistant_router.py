@@ -1,13 +1,16 @@
+import json
 import logging
 import uuid  # Используем для генерации уникальных ID
 from fastapi import APIRouter, HTTPException, status, Response
+from fastapi.responses import StreamingResponse
 
 from tokeon_assistant_rest_api.clients.KnowledgeBaseErrors import (
     KnowledgeBaseUpdateInProgressError,
     KnowledgeBaseConnectionError
 )
 from tokeon_assistant_rest_api.models.models import AskResponse, AskRequest, FeedbackRequest
-from tokeon_assistant_rest_api.clients.ya_gpt import answer_from_knowledge_base
+from tokeon_assistant_rest_api.clients.api import StreamReplace
+from tokeon_assistant_rest_api.clients.ya_gpt import answer_from_knowledge_base, stream_answer_from_knowledge_base
 assistant_router = APIRouter()
 logger = logging.getLogger(__name__)
 
@@ -66,6 +69,83 @@ async def ask_assistant(request_data: AskRequest):
         )
 
 
+def _ndjson(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+@assistant_router.post(
+    "/answers/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Запросить ответ у ассистента в потоковом режиме",
+    description="То же, что POST /answers, но ответ передаётся по мере генерации в формате NDJSON: "
+                "сначала {\"answer_id\"}, затем {\"delta\"} для каждой части текста "
+                "или {\"replace\"} с полным текстом, заменяющим всё полученное ранее, "
+                "в конце {\"done\": true, \"answer\"} или {\"error\"}."
+)
+async def ask_assistant_stream(request_data: AskRequest):
+    """Process a user's question and stream the generated answer as NDJSON.
+
+    Knowledge base errors are reported with the same HTTP status codes as
+    ``POST /answers``; once streaming has started, failures are sent as an
+    ``{"error": ...}`` line.
+
+    Args:
+        request_data: An AskRequest object containing the user's question.
+
+    Returns:
+        StreamingResponse: ``application/x-ndjson`` stream of answer events.
+
+    Raises:
+        HTTPException: If the knowledge base is unavailable or an internal error occurs before streaming.
+    """
+    question = request_data.query
+    generated_answer_id = uuid.uuid4()
+
+    try:
+        logging.info(f"Streaming question for answer_id '{generated_answer_id}': '{question}'")
+        deltas = await stream_answer_from_knowledge_base(question)
+    except KnowledgeBaseUpdateInProgressError as e:
+        logging.error(f"Knowledge base is being updated: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="База знаний обновляется, пожалуйста подождите."
+        )
+    except KnowledgeBaseConnectionError as e:
+        logging.error(f"Failed to connect to knowledge base service: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Не удалось соединиться с сервисом базы знаний."
+        )
+    except Exception as e:
+        logging.error(f"Error processing question for potential answer_id '{generated_answer_id}': {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An internal error occurred while processing your request."
+        )
+
+    async def events():
+        yield _ndjson({"answer_id": str(generated_answer_id)})
+        parts = []
+        try:
+            async for delta in deltas:
+                if isinstance(delta, StreamReplace):
+                    parts = [delta]
+                    yield _ndjson({"replace": str(delta)})
+                    continue
+                parts.append(delta)
+                yield _ndjson({"delta": delta})
+        except Exception as e:
+            logging.error(f"Error streaming answer_id '{generated_answer_id}': {e}", exc_info=True)
+            yield _ndjson({"error": "An internal error occurred while processing your request."})
+            return
+        answer_text = "".join(parts) or None
+        if answer_text is None:
+            logging.warning(f"No answer found in knowledge base for answer_id '{generated_answer_id}")
+        yield _ndjson({"done": True, "answer": answer_text})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
 @assistant_router.post(
     "/answers/{answer_id}/feedback",
     status_code=status.HTTP_204_NO_CONTENT, # Устанавливаем статус по умолчанию
@@ -1,8 +1,16 @@
-import requests
+import json
+import os
+from typing import AsyncIterator, Optional, Union
 
+import httpx
+
+from tokeon_assistant_rest_api.clients.http_pool import get_client
 from tokeon_assistant_rest_api.config import settings
 
-def get_token(oauth_token) -> str:
+YANDEX_IAM_URL = os.getenv("YANDEX_IAM_URL", "https://iam.api.cloud.yandex.net/iam/v1/tokens")
+YANDEX_GPT_COMPLETION_URL = "https://llm.api.cloud.yandex.net/foundationModels/v1/completion"
+
+async def get_token(oauth_token) -> str:
     """Obtain IAM token from Yandex using OAuth token.
 
         Args:
@@ -11,26 +19,66 @@ def get_token(oauth_token) -> str:
         Returns:
             IAM token string if successful, otherwise None.
         """
-    url = "https://iam.api.cloud.yandex.net/iam/v1/tokens"
+    url = YANDEX_IAM_URL
     headers = {"Content-Type": "application/json"}
     data = {"yandexPassportOauthToken": oauth_token}
 
     try:
-        response = requests.post(url, headers=headers, json=data)
+        response = await get_client().post(url, headers=headers, json=data)
         response.raise_for_status()
         return response.json().get("iamToken")
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Fail to get token: {e}")
         return None
 
-def send_request_to_yagpt(
+class StreamReplace(str):
+    """
+    Streamed part that replaces the whole text received so far.
+
+    Yielded when a completion result does not extend the previous one, so
+    that consumers start over instead of appending it.
+    """
+
+
+async def _stream_completion(headers, data):
+    """
+    Yields the new part of the text from each incremental completion result,
+    or a :class:`StreamReplace` with the whole text if the result rewrites
+    what has already been sent.
+    """
+    sent = ""
+    try:
+        async with get_client().stream("POST", YANDEX_GPT_COMPLETION_URL, headers=headers, json=data) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                # Every result carries the whole text generated so far
+                text = json.loads(line)['result']['alternatives'][0]['message']['text']
+                if not text.startswith(sent):
+                    sent = text
+                    yield StreamReplace(text)
+                    continue
+                delta = text[len(sent):]
+                sent = text
+                if delta:
+                    yield delta
+    except httpx.HTTPError as e:
+        print(f"Fail to send API request: {e}")
+        raise
+    except (KeyError, IndexError, ValueError) as e:
+        print(f"Fail to get response: {e}")
+        raise
+
+async def send_request_to_yagpt(
         iam_token,
         prompt_text,
         system_prompt=None,
         temperature=0.6,
         max_tokens=2000,
-        folder_id=settings.ya_gpt.folder_id
-) -> str:
+        folder_id=settings.ya_gpt.folder_id,
+        stream=False
+) -> Union[Optional[str], AsyncIterator[str]]:
     """Send a request to Yandex GPT API and return the generated text.
 
     Args:
@@ -40,12 +88,16 @@ def send_request_to_yagpt(
         temperature: Sampling temperature for creativity (0 to 1).
         max_tokens: Maximum number of tokens in the response.
         folder_id: Yandex Cloud folder ID.
+        stream: If True, consume the incremental completion stream instead of
+            waiting for the whole generation.
 
     Returns:
         Generated response text from the API if successful, otherwise None.
+        With ``stream=True``, an async iterator over the newly generated parts
+        of the text, where a :class:`StreamReplace` part replaces everything
+        yielded before it; it raises if the request fails, so that a cut-off answer
+        can be told apart from a complete one.
     """
-    url = "https://llm.api.cloud.yandex.net/foundationModels/v1/completion"
-
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {iam_token}"
@@ -67,7 +119,7 @@ def send_request_to_yagpt(
     data = {
         "modelUri": f"gpt://{folder_id}/yandexgpt-lite/latest",
         "completionOptions": {
-            "stream": False,
+            "stream": stream,
             "temperature": temperature,
             "maxTokens": str(max_tokens),
             "reasoningOptions": {
@@ -77,13 +129,16 @@ def send_request_to_yagpt(
         "messages": messages
     }
 
+    if stream:
+        return _stream_completion(headers, data)
+
     try:
-        response = requests.post(url, headers=headers, json=data)
+        response = await get_client().post(YANDEX_GPT_COMPLETION_URL, headers=headers, json=data)
         response.raise_for_status()
         result = response.json()
 
         return result['result']['alternatives'][0]['message']['text']
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Fail to send API request: {e}")
         return None
     except (KeyError, IndexError) as e:
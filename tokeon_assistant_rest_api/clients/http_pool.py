@@ -0,0 +1,58 @@
+import os
+
+import httpx
+
+import logging
+logger = logging.getLogger(__name__)
+
+YANDEX_HTTP_MAX_CONNECTIONS = int(os.getenv("YANDEX_HTTP_MAX_CONNECTIONS", 100))
+YANDEX_HTTP_MAX_KEEPALIVE = int(os.getenv("YANDEX_HTTP_MAX_KEEPALIVE", 20))
+YANDEX_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("YANDEX_HTTP_KEEPALIVE_EXPIRY", 60))
+YANDEX_HTTP_CONNECT_TIMEOUT = float(os.getenv("YANDEX_HTTP_CONNECT_TIMEOUT", 5))
+YANDEX_HTTP_READ_TIMEOUT = float(os.getenv("YANDEX_HTTP_READ_TIMEOUT", 60))
+YANDEX_HTTP_POOL_TIMEOUT = float(os.getenv("YANDEX_HTTP_POOL_TIMEOUT", 10))
+
+_client = None
+
+
+def _create_client():
+    """Creates an HTTP/2 AsyncClient with a keep-alive pool for the Yandex Cloud APIs."""
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=YANDEX_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=YANDEX_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=YANDEX_HTTP_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(
+            YANDEX_HTTP_READ_TIMEOUT,
+            connect=YANDEX_HTTP_CONNECT_TIMEOUT,
+            pool=YANDEX_HTTP_POOL_TIMEOUT
+        )
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide HTTP client, creating it on first use.
+
+    The client is shared by the IAM and YandexGPT calls so that their
+    TLS connections are reused; callers must not close it.
+
+    Returns:
+        httpx.AsyncClient: Shared client.
+    """
+    global _client
+    if _client is None:
+        _client = _create_client()
+        logger.info("Yandex HTTP client created")
+    return _client
+
+
+async def close_client():
+    """Closes the shared client; the next :func:`get_client` call creates a new one."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Yandex HTTP client closed")
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+from tokeon_assistant_rest_api.clients.api import YANDEX_IAM_URL
+from tokeon_assistant_rest_api.clients.http_pool import get_client
+
+logger = logging.getLogger(__name__)
+
+IAM_TOKEN_REFRESH_MARGIN = float(os.getenv("IAM_TOKEN_REFRESH_MARGIN", 3600))
+IAM_TOKEN_DEFAULT_TTL = float(os.getenv("IAM_TOKEN_DEFAULT_TTL", 12 * 3600))
+IAM_TOKEN_RETRY_INTERVAL = float(os.getenv("IAM_TOKEN_RETRY_INTERVAL", 30))
+
+
+def parse_expires_at(expires_at: Optional[str]) -> Optional[float]:
+    """
+    Converts the ``expiresAt`` field of an IAM response to seconds from now.
+
+    Args:
+        expires_at: RFC 3339 timestamp, e.g. "2025-01-01T12:00:00.123456789Z".
+
+    Returns:
+        Seconds until the token expires, or None if the timestamp is missing or malformed.
+    """
+    if not expires_at:
+        return None
+    try:
+        value = expires_at.rstrip("Z")
+        if "." in value:
+            # Yandex returns nanoseconds, datetime only accepts microseconds
+            seconds, fraction = value.split(".", 1)
+            value = f"{seconds}.{fraction[:6]}"
+        expires = datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return (expires - datetime.now(timezone.utc)).total_seconds()
+
+
+class IamTokenManager:
+    """
+    Caches the Yandex IAM token and refreshes it before it expires.
+
+    A background task renews the token ``refresh_margin`` seconds ahead of
+    its expiry, so answers never wait for the IAM exchange. If the task is not
+    running or the token has expired anyway, :meth:`get_token` refreshes it
+    inline; concurrent callers share a single request.
+    """
+
+    def __init__(
+            self,
+            oauth_token: str,
+            url: str = YANDEX_IAM_URL,
+            refresh_margin: float = IAM_TOKEN_REFRESH_MARGIN,
+            retry_interval: float = IAM_TOKEN_RETRY_INTERVAL
+    ):
+        """
+        Args:
+            oauth_token: OAuth token from Yandex Passport.
+            url: IAM token endpoint; point it at a local stub server in tests.
+            refresh_margin: How long before expiry the token is renewed, in seconds.
+            retry_interval: Delay before retrying a failed background refresh, in seconds.
+        """
+        self.oauth_token = oauth_token
+        self.url = url
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task = None
+
+    def _is_fresh(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at - self.refresh_margin
+
+    def _is_valid(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at
+
+    async def _fetch(self):
+        response = await get_client().post(self.url, json={"yandexPassportOauthToken": self.oauth_token})
+        response.raise_for_status()
+        result = response.json()
+        ttl = parse_expires_at(result.get("expiresAt"))
+        if ttl is None:
+            ttl = IAM_TOKEN_DEFAULT_TTL
+        self._token = result["iamToken"]
+        self._expires_at = time.monotonic() + ttl
+        logger.info(f"IAM token refreshed, expires in {ttl:.0f} s")
+
+    async def refresh(self, force: bool = False):
+        """
+        Requests a new IAM token unless another caller has just done so.
+
+        Args:
+            force: Refresh even if the cached token is still fresh.
+
+        Raises:
+            httpx.HTTPError: If the IAM endpoint is unreachable or rejects the request.
+            KeyError: If the response has no ``iamToken``.
+        """
+        async with self._lock:
+            if force or not self._is_fresh():
+                await self._fetch()
+
+    async def get_token(self) -> Optional[str]:
+        """
+        Returns a valid IAM token, refreshing it only if there is no valid token cached.
+
+        Returns:
+            IAM token string if successful, otherwise None.
+        """
+        if self._is_valid():
+            return self._token
+        try:
+            async with self._lock:
+                if not self._is_valid():
+                    await self._fetch()
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            logger.error(f"Fail to get token: {e}")
+            return None
+        return self._token
+
+    async def _refresh_loop(self):
+        while True:
+            delay = self._expires_at - self.refresh_margin - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+            except (httpx.HTTPError, KeyError, ValueError) as e:
+                logger.error(f"Background IAM token refresh failed, retrying in {self.retry_interval} s: {e}")
+                await asyncio.sleep(self.retry_interval)
+                continue
+            if not self._is_fresh():
+                # Token lifetime shorter than the margin: do not hammer the IAM endpoint
+                await asyncio.sleep(self.retry_interval)
+
+    def start(self):
+        """Starts the background refresh task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        """Stops the background refresh task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,7 +1,7 @@
 import logging
 import os
 import httpx
-from typing import Optional
+from typing import List, Optional, Tuple
 from tokeon_assistant_rest_api.clients.KnowledgeBaseErrors import (
     KnowledgeBaseUpdateInProgressError,
     KnowledgeBaseConnectionError
@@ -68,3 +68,34 @@ class KnowledgeBaseClient:
             
             logger.error(f"Error getting knowledge base data: {e}")
             raise
+
+    async def embed_question(self, question: str) -> Tuple[List[float], str]:
+        """
+        Get the embedding of a question and the current knowledge base version.
+
+        Args:
+            question: The question to embed
+
+        Returns:
+            Tuple of the question embedding and the knowledge base version
+
+        Raises:
+            KnowledgeBaseConnectionError: If there is a problem connecting to the knowledge base API
+            Exception: For other errors
+        """
+        url = f"{self.base_url}/knowledge-base/embed-question"
+
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(url, json={"question": question})
+
+                if response.status_code != 200:
+                    logger.error(f"Error from knowledge base API: {response.text}")
+                    raise Exception(f"Failed to embed question: {response.text}")
+
+                result = response.json()
+                return result["embedding"], result["kb_version"]
+        except httpx.RequestError as e:
+            logger.error(f"Error connecting to knowledge base API: {e}")
+            raise KnowledgeBaseConnectionError(f"Не удалось соединиться с сервисом базы знаний: {e}")
+
@@ -0,0 +1,264 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+import numpy as np
+
+try:
+    from qdrant_client import AsyncQdrantClient
+    from qdrant_client.models import (
+        Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue, Range,
+        FilterSelector, PayloadSchemaType,
+    )
+except ImportError:  # Qdrant sharing is optional
+    AsyncQdrantClient = None
+
+logger = logging.getLogger(__name__)
+
+# Off by default: a wrong hit serves the answer to a different question.
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+# e5 cosine similarities are compressed towards the top of the range: short
+# questions that differ in one key word ("как пополнить счёт" / "как вывести
+# средства со счёта") still score around 0.9. Calibrate on pairs of real
+# questions from the logs before enabling the cache; the default only admits
+# near-verbatim rephrasings.
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.98))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", 24 * 3600))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 10_000))
+# Empty: in-process index only; otherwise answers are shared through this Qdrant collection.
+# The name always gets the "__" prefix, which the knowledge base API reserves for
+# collections of other services and never searches.
+SEMANTIC_CACHE_QDRANT_COLLECTION = os.getenv("SEMANTIC_CACHE_QDRANT_COLLECTION", "")
+SERVICE_COLLECTION_PREFIX = "__"
+SEMANTIC_CACHE_QDRANT_HOST = os.getenv("SEMANTIC_CACHE_QDRANT_HOST", os.getenv("QDRANT_HOST", "qdrant"))
+SEMANTIC_CACHE_QDRANT_PORT = int(os.getenv("SEMANTIC_CACHE_QDRANT_PORT", os.getenv("QDRANT_PORT", 6333)))
+
+
+class SemanticAnswerCache:
+    """
+    Answer cache keyed on the question embedding and the knowledge base version.
+
+    A lookup returns the stored answer of the most similar cached question if
+    its cosine similarity reaches ``threshold``. Entries expire after ``ttl``
+    seconds, and all of them are dropped as soon as a different knowledge base
+    version is seen, i.e. after every renew.
+
+    The index lives in process memory as a matrix of normalized embeddings.
+    With ``qdrant_collection`` set, entries are also written to and looked up
+    in a Qdrant collection, so that replicas share answers.
+    """
+
+    def __init__(
+            self,
+            threshold: float = SEMANTIC_CACHE_THRESHOLD,
+            ttl: float = SEMANTIC_CACHE_TTL,
+            max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+            qdrant_collection: str = SEMANTIC_CACHE_QDRANT_COLLECTION
+    ):
+        """
+        Args:
+            threshold: Minimum cosine similarity for a hit.
+            ttl: Lifetime of an entry, in seconds.
+            max_entries: Maximum number of entries in memory; the oldest are evicted first.
+            qdrant_collection: Qdrant collection for sharing entries between replicas, or "" to disable;
+                prefixed with ``SERVICE_COLLECTION_PREFIX`` if needed.
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.kb_version = None
+        self.hits = 0
+        self.misses = 0
+        self._vectors = None
+        self._answers = []
+        self._created_at = np.empty(0)
+        self._lock = threading.Lock()
+
+        if qdrant_collection and not qdrant_collection.startswith(SERVICE_COLLECTION_PREFIX):
+            qdrant_collection = SERVICE_COLLECTION_PREFIX + qdrant_collection
+        self.qdrant_collection = qdrant_collection
+        self._qdrant = None
+        self._qdrant_ready = False
+        self._qdrant_purge_pending = False
+        if qdrant_collection and AsyncQdrantClient is None:
+            logger.error("SEMANTIC_CACHE_QDRANT_COLLECTION is set but qdrant-client is not installed, "
+                         "semantic cache is in-process only")
+            self.qdrant_collection = ""
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _clear(self):
+        self._vectors = None
+        self._answers = []
+        self._created_at = np.empty(0)
+
+    def _check_version(self, kb_version: str):
+        """Drops the index if the knowledge base has been renewed."""
+        if kb_version == self.kb_version:
+            return
+        if self.kb_version is not None:
+            logger.info(f"Knowledge base version changed to {kb_version}, semantic cache cleared")
+        self.kb_version = kb_version
+        self._qdrant_purge_pending = True
+        self._clear()
+
+    def _purge(self, now: float):
+        keep = self._created_at > now - self.ttl
+        if len(keep) > self.max_entries:
+            keep[:len(keep) - self.max_entries] = False
+        if keep.all():
+            return
+        self._vectors = self._vectors[keep] if keep.any() else None
+        self._answers = [answer for answer, kept in zip(self._answers, keep) if kept]
+        self._created_at = self._created_at[keep]
+
+    def _local_lookup(self, vector: np.ndarray, kb_version: str) -> Optional[str]:
+        with self._lock:
+            self._check_version(kb_version)
+            if self._vectors is None:
+                return None
+            if self._vectors.shape[1] != len(vector):
+                return None
+            scores = self._vectors @ vector
+            scores[self._created_at <= time.time() - self.ttl] = -1.0
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return self._answers[best]
+        return None
+
+    def _local_store(self, vector: np.ndarray, kb_version: str, answer: str, created_at: float):
+        with self._lock:
+            self._check_version(kb_version)
+            if self._vectors is not None and self._vectors.shape[1] != len(vector):
+                # The embedding model has changed
+                self._clear()
+            self._vectors = vector[None, :] if self._vectors is None else np.vstack([self._vectors, vector])
+            self._answers.append(answer)
+            self._created_at = np.append(self._created_at, created_at)
+            self._purge(time.time())
+
+    async def _get_qdrant(self, size: int):
+        if not self._qdrant_ready:
+            if self._qdrant is None:
+                self._qdrant = AsyncQdrantClient(
+                    host=SEMANTIC_CACHE_QDRANT_HOST,
+                    port=SEMANTIC_CACHE_QDRANT_PORT,
+                    prefer_grpc=True
+                )
+            if not await self._qdrant.collection_exists(self.qdrant_collection):
+                await self._qdrant.create_collection(
+                    collection_name=self.qdrant_collection,
+                    vectors_config=VectorParams(size=size, distance=Distance.COSINE)
+                )
+                await self._qdrant.create_payload_index(
+                    collection_name=self.qdrant_collection,
+                    field_name="kb_version",
+                    field_schema=PayloadSchemaType.KEYWORD
+                )
+            self._qdrant_ready = True
+        return self._qdrant
+
+    async def _qdrant_lookup(self, vector: np.ndarray, kb_version: str):
+        client = await self._get_qdrant(len(vector))
+        hits = await client.search(
+            collection_name=self.qdrant_collection,
+            query_vector=vector.tolist(),
+            query_filter=Filter(must=[
+                FieldCondition(key="kb_version", match=MatchValue(value=kb_version)),
+                FieldCondition(key="created_at", range=Range(gt=time.time() - self.ttl)),
+            ]),
+            limit=1,
+            score_threshold=self.threshold,
+            with_payload=["answer", "created_at"]
+        )
+        if not hits:
+            return None
+        return hits[0].payload["answer"], hits[0].payload["created_at"]
+
+    async def _qdrant_store(self, vector: np.ndarray, kb_version: str, answer: str, created_at: float):
+        client = await self._get_qdrant(len(vector))
+        if self._qdrant_purge_pending:
+            self._qdrant_purge_pending = False
+            await client.delete(
+                collection_name=self.qdrant_collection,
+                points_selector=FilterSelector(filter=Filter(must_not=[
+                    FieldCondition(key="kb_version", match=MatchValue(value=kb_version))
+                ]))
+            )
+        await client.upsert(
+            collection_name=self.qdrant_collection,
+            points=[PointStruct(
+                id=str(uuid.uuid4()),
+                vector=vector.tolist(),
+                payload={"kb_version": kb_version, "answer": answer, "created_at": created_at}
+            )]
+        )
+
+    def _count(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        lookups = self.hits + self.misses
+        if lookups % 100 == 0:
+            logger.info(f"Semantic answer cache: {self.hits}/{lookups} hits, {len(self._answers)} entries")
+
+    async def lookup(self, embedding: List[float], kb_version: str) -> Optional[str]:
+        """
+        Finds the cached answer of a sufficiently similar question.
+
+        Args:
+            embedding: Question embedding.
+            kb_version: Current knowledge base version.
+
+        Returns:
+            Cached answer, or None on a miss.
+        """
+        vector = self._normalize(embedding)
+        answer = self._local_lookup(vector, kb_version)
+        if answer is None and self.qdrant_collection:
+            try:
+                found = await self._qdrant_lookup(vector, kb_version)
+            except Exception as e:
+                logger.warning(f"Semantic cache lookup in Qdrant failed: {e}")
+                found = None
+            if found is not None:
+                answer, created_at = found
+                self._local_store(vector, kb_version, answer, created_at)
+        self._count(answer is not None)
+        return answer
+
+    async def store(self, embedding: List[float], kb_version: str, answer: str):
+        """
+        Caches the answer to a question.
+
+        Args:
+            embedding: Question embedding.
+            kb_version: Knowledge base version the answer was generated against.
+            answer: Generated answer.
+        """
+        vector = self._normalize(embedding)
+        created_at = time.time()
+        self._local_store(vector, kb_version, answer, created_at)
+        if self.qdrant_collection:
+            try:
+                await self._qdrant_store(vector, kb_version, answer, created_at)
+            except Exception as e:
+                logger.warning(f"Semantic cache store in Qdrant failed: {e}")
+
+    async def close(self):
+        """Closes the Qdrant client, if any."""
+        if self._qdrant is not None:
+            await self._qdrant.close()
+            self._qdrant = None
+            self._qdrant_ready = False
+
+
+semantic_cache = SemanticAnswerCache()
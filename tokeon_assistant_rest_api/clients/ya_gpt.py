@@ -1,7 +1,9 @@
-from asyncio import to_thread
-from tokeon_assistant_rest_api.clients.api import get_token, send_request_to_yagpt
+from tokeon_assistant_rest_api.clients.api import StreamReplace, send_request_to_yagpt
+from tokeon_assistant_rest_api.clients.iam_token_manager import IamTokenManager
 from tokeon_assistant_rest_api.clients.knowledge_base_client import KnowledgeBaseClient
+from tokeon_assistant_rest_api.clients.semantic_cache import SEMANTIC_CACHE_ENABLED, semantic_cache
 import json
+from typing import AsyncIterator, List, Optional, Tuple
 from tokeon_assistant_rest_api.config import settings
 import logging
 
@@ -10,6 +12,74 @@ logger = logging.getLogger(__name__)
 # Initialize the Knowledge Base client
 kb_client = KnowledgeBaseClient()
 
+# IAM tokens live for hours; refreshed in the background, see main.lifespan
+iam_token_manager = IamTokenManager(settings.ya_gpt.api_key)
+
+async def lookup_cached_answer(raw_question: str) -> Tuple[Optional[str], Optional[Tuple[List[float], str]]]:
+    """
+    Looks the question up in the semantic answer cache.
+
+    Cache failures never fail the question: they are logged and treated as a miss.
+
+    Args:
+        raw_question (str): The original user question.
+
+    Returns:
+        Tuple of the cached answer (None on a miss) and the cache key
+        (question embedding and knowledge base version) to store the new
+        answer under, or None if the cache is disabled or unavailable.
+    """
+    if not SEMANTIC_CACHE_ENABLED:
+        return None, None
+    try:
+        embedding, kb_version = await kb_client.embed_question(raw_question)
+        answer = await semantic_cache.lookup(embedding, kb_version)
+    except Exception as e:
+        logger.warning(f"Semantic answer cache unavailable: {e}")
+        return None, None
+    if answer is not None:
+        logger.info(f"Answer served from semantic cache (kb version {kb_version})")
+    return answer, (embedding, kb_version)
+
+async def lookup_or_prepare(raw_question: str) -> Tuple[Optional[str], Optional[Tuple[List[float], str]], Optional[str]]:
+    """
+    Looks the question up in the semantic answer cache and prepares the
+    knowledge base data for it only on a miss, so that a hit costs a single
+    embedding and no retrieval.
+
+    Args:
+        raw_question (str): The original user question.
+
+    Returns:
+        Tuple of the cached answer, the cache key (see :func:`lookup_cached_answer`)
+        and the prepared knowledge base data. On a hit only the answer is set.
+
+    Raises:
+        KnowledgeBaseUpdateInProgressError, KnowledgeBaseConnectionError:
+            On a cache miss, if the knowledge base data cannot be prepared.
+    """
+    cached_answer, cache_key = await lookup_cached_answer(raw_question)
+    if cached_answer is not None:
+        return cached_answer, None, None
+    return None, cache_key, await kb_client.prepare_question(raw_question)
+
+async def _single_part(answer: str) -> AsyncIterator[str]:
+    yield answer
+
+async def _store_when_complete(deltas: AsyncIterator[str], cache_key: Tuple[List[float], str]) -> AsyncIterator[str]:
+    """Passes the streamed parts through and caches the answer once the stream has completed."""
+    parts = []
+    async for delta in deltas:
+        if isinstance(delta, StreamReplace):
+            parts = []
+        parts.append(delta)
+        yield delta
+    if parts:
+        try:
+            await semantic_cache.store(*cache_key, "".join(parts))
+        except Exception as e:
+            logger.warning(f"Failed to cache answer: {e}")
+
 async def answer_from_knowledge_base(raw_question: str) -> str:
     """
     Processes a user's raw question to generate an answer using the knowledge base and an AI model.
@@ -19,10 +89,13 @@ async def answer_from_knowledge_base(raw_question: str) -> str:
     2. Lemmatizes the question text using a Russian lemmatizer.
     3. Extracts the main question from lemmas.
     4. Prepares relevant knowledge base data for the question.
-    5. Obtains an authentication token for the AI model.
+    5. Takes the cached authentication token for the AI model.
     6. Sends a request to the AI model with the user prompt and system instructions.
     7. Logs and returns the generated answer.
 
+    A semantically equivalent question answered against the same knowledge
+    base version is served from the semantic answer cache instead.
+
     Args:
         raw_question (str): The original user question.
 
@@ -30,20 +103,61 @@ async def answer_from_knowledge_base(raw_question: str) -> str:
         str: The answer generated by the AI model based on the knowledge base.
     """
     logger.info(f"Question: {raw_question}")
-    kb_data_for_question = await kb_client.prepare_question(raw_question)
+    cached_answer, cache_key, kb_data_for_question = await lookup_or_prepare(raw_question)
+    if cached_answer is not None:
+        return cached_answer
+
     logger.info(f"KB data for question: {kb_data_for_question[:100]}")
-    iam = await to_thread(get_token, settings.ya_gpt.api_key)
+    iam = await iam_token_manager.get_token()
 
-    answer = await to_thread(
-        send_request_to_yagpt,
+    answer = await send_request_to_yagpt(
         iam,
         getUserPrompt(raw_question, kb_data_for_question),
         system_prompt=getSystemPrompt(),
         temperature=0.0,
     )
     logger.info(f"Answer: {answer}")
+    if answer and cache_key is not None:
+        try:
+            await semantic_cache.store(*cache_key, answer)
+        except Exception as e:
+            logger.warning(f"Failed to cache answer: {e}")
     return answer
 
+async def stream_answer_from_knowledge_base(raw_question: str) -> AsyncIterator[str]:
+    """
+    Streaming variant of :func:`answer_from_knowledge_base`.
+
+    Knowledge base data and the token are obtained before returning, so
+    knowledge base errors are raised here rather than while iterating.
+
+    Args:
+        raw_question (str): The original user question.
+
+    Returns:
+        AsyncIterator[str]: Parts of the answer as YandexGPT generates them
+            (a :class:`StreamReplace` part replaces the text so far),
+            or the whole cached answer as a single part.
+    """
+    logger.info(f"Question (stream): {raw_question}")
+    cached_answer, cache_key, kb_data_for_question = await lookup_or_prepare(raw_question)
+    if cached_answer is not None:
+        return _single_part(cached_answer)
+
+    logger.info(f"KB data for question: {kb_data_for_question[:100]}")
+    iam = await iam_token_manager.get_token()
+
+    deltas = await send_request_to_yagpt(
+        iam,
+        getUserPrompt(raw_question, kb_data_for_question),
+        system_prompt=getSystemPrompt(),
+        temperature=0.0,
+        stream=True,
+    )
+    if cache_key is None:
+        return deltas
+    return _store_when_complete(deltas, cache_key)
+
 def getSystemPrompt() -> str:
     """
     Returns the system prompt string for the AI assistant.
@@ -1,7 +1,11 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from tokeon_assistant_rest_api.api.router.assistant_router import assistant_router
+from tokeon_assistant_rest_api.clients.http_pool import get_client, close_client
+from tokeon_assistant_rest_api.clients.semantic_cache import semantic_cache
+from tokeon_assistant_rest_api.clients.ya_gpt import iam_token_manager
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,6 +21,20 @@ def configure_logging() -> None:
         format="%(asctime)s %(levelname)s %(name)s: %(message)s",
     )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Creates the shared Yandex HTTP client, fetches the IAM token at startup
+    and keeps it refreshed in the background.
+    """
+    get_client()
+    await iam_token_manager.get_token()
+    iam_token_manager.start()
+    yield
+    await iam_token_manager.close()
+    await semantic_cache.close()
+    await close_client()
+
 def create_app() -> FastAPI:
     """
     Create and configure the FastAPI application instance.
@@ -32,7 +50,8 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="Tokeon Assistant REST API",
         description="REST API for answering user questions from a knowledge base using GPT",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
 
     @app.get("/health")